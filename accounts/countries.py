@@ -0,0 +1,34 @@
+# accounts/countries.py
+import json
+from functools import lru_cache
+from pathlib import Path
+
+# Compact list of country names shipped with the app (regenerate with build_country_data)
+DATA_FILE = Path(__file__).resolve().parent / "data" / "countries.json"
+
+
+def names_from_pycountry():
+    """Country names straight from pycountry's (large) ISO 3166 database."""
+    import pycountry
+
+    return [country.name for country in pycountry.countries]
+
+
+@lru_cache(maxsize=None)
+def country_names():
+    """
+    Country names in pycountry order, loaded once per process on first use.
+
+    Read from DATA_FILE when present; pycountry is only imported as a fallback.
+    """
+    try:
+        with open(DATA_FILE, encoding="utf-8") as data:
+            return tuple(json.load(data))
+    except FileNotFoundError:
+        return tuple(names_from_pycountry())
+
+
+@lru_cache(maxsize=None)
+def country_choices():
+    """(value, label) choices for the profile location field, blank option first."""
+    return (("", "Select your country"),) + tuple((name, name) for name in country_names())
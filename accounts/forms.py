@@ -21,16 +21,15 @@ class LoginForm(forms.Form):
     )
 
 
-import pycountry
+from .countries import country_choices
 
 
 class ProfileUpdateForm(forms.ModelForm):
     """Form for users to update their profile details, including location and phone number."""
 
-    # Location dropdown using pycountry
-    country_choices = [(country.name, country.name) for country in pycountry.countries]
+    # Location dropdown; choices are resolved (and cached) on first use, not at import
     location = forms.ChoiceField(
-        choices=[("", "Select your country")] + country_choices,
+        choices=country_choices,
         widget=forms.Select(attrs={"class": "form-control"}),
         required=False
     )
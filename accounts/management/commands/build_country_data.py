@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from accounts.countries import DATA_FILE, names_from_pycountry
+
+
+class Command(BaseCommand):
+    help = "Regenerate the bundled country list (accounts/data/countries.json) from pycountry"
+
+    def handle(self, *args, **options):
+        names = names_from_pycountry()
+        DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(DATA_FILE, "w", encoding="utf-8") as data:
+            json.dump(names, data, ensure_ascii=False, separators=(",", ":"))
+            data.write("\n")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(names)} countries to {DATA_FILE}."))
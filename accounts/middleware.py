@@ -0,0 +1,34 @@
+# accounts/middleware.py
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .utils import get_cached_user
+
+
+def _get_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = get_cached_user(request)
+    return request._cached_user
+
+
+async def _auser(request):
+    # Shares the sync cache, so an async view's sync render reuses the user
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = await sync_to_async(get_cached_user)(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that resolves request.user from the per-user
+    cache (see accounts.utils.get_cached_user) instead of querying the user
+    row on every request. Drop-in replacement in MIDDLEWARE.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+        request.auser = partial(_auser, request)
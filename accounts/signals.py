@@ -0,0 +1,13 @@
+# accounts/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .utils import invalidate_user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Profile edits, password changes, logins (last_login) and deletions drop the cached request user."""
+    invalidate_user_cache(instance.pk)
@@ -1,3 +1,142 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.factories import make_staff
+from core.testing import QueryBudgetTestCase
+
+from .countries import country_choices, country_names
+from .forms import ProfileUpdateForm
+from .models import PasswordResetToken, StaffInvitation
+
+
+class AccountsQueryBudgetTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.invitation = StaffInvitation.objects.create(email="invited@example.com")
+        cls.reset_token = PasswordResetToken.objects.create(user=cls.member, token="r" * 64)
+
+    def pages(self):
+        return {
+            "login": reverse("login"),
+            "password_reset_request": reverse("password_reset_request"),
+            "password_reset_confirm": reverse("password_reset_confirm", args=[self.reset_token.token]),
+            "staff_register": reverse("staff_register", args=[self.invitation.token]),
+            "profile": reverse("profile"),
+        }
+
+    def test_anonymous(self):
+        pages = self.pages()
+        self.assertBudgets(None, {
+            pages["login"]: 0,
+            pages["password_reset_request"]: 0,
+            pages["password_reset_confirm"]: 2,
+            pages["staff_register"]: 1,
+            pages["profile"]: 0,
+        })
+
+    def test_admin(self):
+        pages = self.pages()
+        self.assertBudgets(self.admin, {
+            pages["login"]: 2,
+            pages["password_reset_request"]: 2,
+            pages["password_reset_confirm"]: 4,
+            pages["staff_register"]: 2,
+            pages["profile"]: 4,
+        })
+
+    def test_staff(self):
+        pages = self.pages()
+        self.assertBudgets(self.member, {
+            pages["login"]: 2,
+            pages["password_reset_request"]: 2,
+            pages["password_reset_confirm"]: 4,
+            pages["staff_register"]: 2,
+            pages["profile"]: 4,
+        })
+
+
+class CachedRequestUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.member = make_staff(1)[0]
+        self.client.force_login(self.member)
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("staff_dashboard"))
+        user_queries = [query for query in queries if 'FROM "accounts_user"' in query["sql"]]
+        return response, user_queries
+
+    def test_warm_cache_skips_the_user_query(self):
+        self.assertEqual(len(self.get_dashboard()[1]), 1)
+        response, user_queries = self.get_dashboard()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, [])
+        self.assertEqual(response.context["user"], self.member)
+
+    def test_saving_the_user_refreshes_the_cache(self):
+        self.get_dashboard()
+        self.member.first_name = "Renamed"
+        self.member.save()
+        response, user_queries = self.get_dashboard()
+        self.assertEqual(len(user_queries), 1)
+        self.assertEqual(response.context["user"].first_name, "Renamed")
+
+    def test_deactivated_or_new_password_logs_out(self):
+        self.get_dashboard()
+        self.member.set_password("changed")
+        self.member.save()
+        self.assertEqual(self.get_dashboard()[0].status_code, 302)
+
+        self.client.force_login(self.member)
+        self.get_dashboard()
+        self.member.is_active = False
+        self.member.save()
+        self.assertEqual(self.get_dashboard()[0].status_code, 302)
+
+
+class CountryChoicesTests(TestCase):
+    def setUp(self):
+        self.clear()
+        self.addCleanup(self.clear)
+
+    def clear(self):
+        country_names.cache_clear()
+        country_choices.cache_clear()
+
+    def test_choices_are_built_on_first_use(self):
+        with mock.patch("accounts.countries.names_from_pycountry") as from_pycountry:
+            form = ProfileUpdateForm()
+            self.assertEqual(country_choices.cache_info().currsize, 0)
+
+            choices = list(form.fields["location"].choices)
+            self.assertEqual(choices[0], ("", "Select your country"))
+            self.assertIn(("Nigeria", "Nigeria"), choices)
+            # Read from the bundled file, without touching pycountry
+            from_pycountry.assert_not_called()
+
+        # Later forms reuse the cached choices
+        list(ProfileUpdateForm().fields["location"].choices)
+        self.assertEqual(country_choices.cache_info().hits, 1)
+        self.assertEqual(country_names.cache_info().misses, 1)
+
+    def test_stored_country_validates_and_is_selected(self):
+        member = make_staff(1)[0]
+        member.location = "Nigeria"
+        member.save()
+        form = ProfileUpdateForm(
+            {"email": member.email, "first_name": "Ada", "last_name": "Obi", "location": member.location},
+            instance=member,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertFalse(ProfileUpdateForm({**form.data, "location": "Atlantis"}, instance=member).is_valid())
 
-# Create your tests here.
+        self.client.force_login(member)
+        response = self.client.get(reverse("profile"))
+        self.assertContains(response, '<option value="Nigeria" selected>', html=False)
@@ -1,8 +1,16 @@
 # accounts/utils.py
 import secrets
-from django.core.mail import send_mail
+from core.mail import queue_email
 from django.urls import reverse
 from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import router
+from django.db.models.fields.files import FieldFile
+from django.utils.crypto import constant_time_compare
+from .models import User
 
 
 # ===================================
@@ -42,12 +50,71 @@ Thanks,
 SignalTrackr Team
 """
 
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+        queue_email(subject=subject, body=message, to=[user.email])
     except Exception as e:
-        print(f"⚠️ Error in send_password_reset_email: {str(e)}")
\ No newline at end of file
+        print(f"⚠️ Error in send_password_reset_email: {str(e)}")
+
+# ===================================
+# 👤 Cached request user
+# ===================================
+def _user_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+
+def user_cache_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def _cached_fields():
+    # Everything but the password hash; its session hash is cached instead
+    return [field.attname for field in User._meta.concrete_fields if field.attname != "password"]
+
+
+def cache_user(user):
+    """Store the user's row (without the password hash) for get_cached_user()."""
+    values = {}
+    for name in _cached_fields():
+        value = getattr(user, name)
+        # Image fields hold a FieldFile; the stored path is enough to rebuild it
+        values[name] = value.name if isinstance(value, FieldFile) else value
+    values["session_auth_hash"] = user.get_session_auth_hash()
+    _user_cache().set(user_cache_key(user.pk), values, getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300))
+
+
+def get_cached_user(request):
+    """
+    The logged-in user for this request, from the per-user cache when possible.
+
+    Checks the same things as django.contrib.auth.get_user() (a known
+    backend, an active user and a matching session hash) but against the
+    cached entry, so most requests skip the user query. The password is
+    left deferred and only loaded if something asks for it. Anything that
+    does not check out falls back to get_user(), which also handles session
+    hash rotation and flushing.
+    """
+    session = request.session
+    try:
+        user_id = User._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except (KeyError, ValidationError):
+        return AnonymousUser()
+
+    values = _user_cache().get(user_cache_key(user_id))
+    if (
+        values is not None
+        and backend_path in settings.AUTHENTICATION_BACKENDS
+        and values["is_active"]
+        and constant_time_compare(session.get(HASH_SESSION_KEY, ""), values["session_auth_hash"])
+    ):
+        names = _cached_fields()
+        return User.from_db(router.db_for_read(User), names, [values[name] for name in names])
+
+    user = get_user(request)
+    if user.is_authenticated:
+        cache_user(user)
+    return user
+
+
+def invalidate_user_cache(*user_ids):
+    """Drop the cached request user for the given users."""
+    _user_cache().delete_many([user_cache_key(user_id) for user_id in user_ids])
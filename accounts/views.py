@@ -6,7 +6,7 @@ from accounts.models import StaffInvitation, User, PasswordResetAttempt, Passwor
 from accounts.forms import LoginForm, ProfileUpdateForm, StaffRegisterForm
 from .forms import PasswordResetForm, PasswordResetRequestForm
 from .utils import *
-import pycountry
+from .countries import country_names
 
 def login_view(request):
     """Custom login view with email-only login and role-based redirects."""
@@ -147,7 +147,7 @@ def logout_view(request):
 def profile_view(request):
     """Allow user to update their profile."""
     user = request.user
-    countries = list(pycountry.countries)
+    countries = country_names()
     if request.method == "POST":
         form = ProfileUpdateForm(request.POST, request.FILES, instance=user)
         if form.is_valid():
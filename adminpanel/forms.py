@@ -13,6 +13,38 @@ class StaffInvitationForm(forms.ModelForm):
         }
 
 
+class BulkInvitationForm(forms.Form):
+    """A CSV file (email in the first column) or, without one, a pasted list, one address per line."""
+    emails = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={
+            "class": "form-control",
+            "rows": 8,
+            "placeholder": "One email address per line"
+        }),
+    )
+    csv_file = forms.FileField(
+        required=False,
+        label="CSV file",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,text/csv"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get("csv_file")
+        text = cleaned_data.get("emails", "")
+        if upload:
+            try:
+                # utf-8-sig drops the byte order mark spreadsheet exports start with
+                text = upload.read().decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise forms.ValidationError("The CSV file must be UTF-8 encoded.")
+        if not text.strip():
+            raise forms.ValidationError("Paste some email addresses or choose a CSV file.")
+        cleaned_data["text"] = text
+        return cleaned_data
+
+
 
 from django import forms
 from accounts.models import User
@@ -0,0 +1,45 @@
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminpanel.utils import BULK_INVITE_MAX_ROWS, INVITED, bulk_invite, parse_invite_rows
+
+
+class Command(BaseCommand):
+    help = "Invite staff in bulk from a CSV file (email in the first column) and queue the invitation emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help='CSV file of email addresses, or "-" to read them from stdin.')
+        parser.add_argument("--json", action="store_true", help="Print the per-row results as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["csv_path"]
+        try:
+            if path == "-":
+                text = sys.stdin.read()
+            else:
+                with open(path, encoding="utf-8-sig", newline="") as source:
+                    text = source.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        rows = parse_invite_rows(text)
+        if len(rows) > BULK_INVITE_MAX_ROWS:
+            raise CommandError(f"{len(rows)} addresses found; at most {BULK_INVITE_MAX_ROWS} can be invited at once.")
+        results = bulk_invite(rows)
+        totals = Counter(result["status"] for result in results)
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"totals": totals, "rows": results}, indent=2))
+            return
+
+        for result in results:
+            if result["status"] != INVITED:
+                self.stdout.write(f"row {result['row']:<6} {result['email']:<40} {result['status']:<16} {result['message']}")
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(totals.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Invited {totals[INVITED]} of {len(results)} address(es) ({summary or 'none found'}); "
+            f"the emails are queued for send_queued_emails."
+        ))
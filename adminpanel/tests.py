@@ -1,3 +1,162 @@
+import io
+import json
+import os
+import tempfile
+from collections import Counter
+from datetime import date
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import StaffInvitation
+from attendance.models import DailyAttendanceSummary
+from attendance.utils import refresh_daily_summaries
+from core.factories import make_admin, make_staff
+from core.mail import OutboundEmail
+from core.testing import QueryBudgetTestCase
+from leave.models import Leave, LeaveDay, Notification
+
+from .utils import bulk_invite
+
+
+class AdminPanelQueryBudgetTests(QueryBudgetTestCase):
+    def pages(self):
+        return [
+            reverse("admin_dashboard"),
+            reverse("manage_staff"),
+            reverse("edit_staff", args=[self.member.id]),
+            reverse("leave_requests"),
+            reverse("send_staff_invite"),
+            reverse("bulk_staff_invite"),
+        ]
+
+    def test_admin(self):
+        dashboard, manage, edit, leave_requests, invite, bulk_invite = self.pages()
+        self.assertBudgets(self.admin, {
+            dashboard: 8,
+            manage: 6,
+            edit: 5,
+            leave_requests: 9,
+            f"{leave_requests}?pending_page=3&approved_page=5": 9,
+            invite: 6,
+            bulk_invite: 4,
+        })
+
+    def test_staff_is_turned_away(self):
+        self.assertBudgets(self.member, {url: 2 for url in self.pages()})
+
+    def test_anonymous_is_turned_away(self):
+        self.assertBudgets(None, {url: 0 for url in self.pages()})
+
+    def test_approve_leave(self):
+        leave = Leave.objects.filter(status="pending").first()
+        self.assertQueryBudget(19, self.admin, reverse("leave_requests"), method="post",
+                               data={"leave_id": leave.id, "action": "approve"})
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, "approved")
+
+    def test_bulk_invite(self):
+        StaffInvitation.objects.create(email="pending@example.com")
+        pasted = "\n".join(
+            [f"new{i}@example.com" for i in range(200)]
+            + [self.member.email.upper(), "pending@example.com", "new0@example.com", "not-an-email"]
+        )
+        response = self.assertQueryBudget(13, self.admin, reverse("bulk_staff_invite"), method="post",
+                                          data={"emails": pasted})
+
+        statuses = Counter(result["status"] for result in response.context["results"])
+        self.assertEqual(statuses, {"invited": 200, "registered": 1, "already_invited": 1, "duplicate": 1, "invalid": 1})
+        self.assertEqual(StaffInvitation.objects.filter(email__startswith="new").count(), 200)
+        self.assertEqual(OutboundEmail.objects.filter(subject__startswith="You are invited").count(), 200)
+        self.assertEqual([str(message) for message in response.context["messages"]],
+                         ["200 of 204 invitation(s) queued."])
+
+    def test_bulk_invite_looks_up_in_chunks(self):
+        rows = [(i + 1, f"chunked{i}@example.com") for i in range(5)]
+        with mock.patch("adminpanel.utils.LOOKUP_CHUNK_SIZE", 2), CaptureQueriesContext(connection) as queries:
+            results = bulk_invite(rows)
+        self.assertEqual([result["status"] for result in results], ["invited"] * 5)
+        self.assertEqual(OutboundEmail.objects.filter(subject__startswith="You are invited").count(), 5)
+        # Three lookups each for users, invitations and the created tokens
+        lookups = [query["sql"] for query in queries if query["sql"].startswith("SELECT") and " IN (" in query["sql"]]
+        self.assertEqual(len(lookups), 9)
+
+    def test_invite_staff_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as source:
+            source.write(f"email,name\ncsv@example.com,New Hire\n{self.member.email},Existing\n")
+        self.addCleanup(os.remove, source.name)
+        output = io.StringIO()
+        call_command("invite_staff", source.name, "--json", stdout=output)
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(report["totals"], {"invited": 1, "registered": 1})
+        self.assertEqual([row["row"] for row in report["rows"]], [2, 3])
+        self.assertTrue(StaffInvitation.objects.filter(email="csv@example.com").exists())
+
+    def test_queries_do_not_grow_with_data(self):
+        for url in [reverse("admin_dashboard"), reverse("manage_staff"), reverse("leave_requests")]:
+            with self.subTest(url=url):
+                self.assertQueriesDoNotGrow(self.admin, url)
+
+
+class LeaveDecisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_admin()
+        cls.member = make_staff(1)[0]
+        # Monday to Wednesday
+        cls.leave = Leave.objects.create(
+            staff=cls.member, leave_type="vacation", start_date=date(2025, 3, 10),
+            end_date=date(2025, 3, 12), reason="Family visit",
+        )
+        refresh_daily_summaries(cls.leave.start_date, cls.leave.end_date)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def decide(self, action):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("leave_requests"), {"leave_id": self.leave.id, "action": action})
+
+    def on_leave(self):
+        return list(
+            DailyAttendanceSummary.objects.filter(date__range=(self.leave.start_date, self.leave.end_date))
+            .order_by("date").values_list("on_leave", flat=True)
+        )
+
+    def test_approving_writes_leave_days_and_moves_the_rollup(self):
+        self.assertEqual(self.on_leave(), [0, 0, 0])
+        self.decide("approve")
+        self.assertEqual(
+            list(LeaveDay.objects.filter(leave=self.leave).order_by("date").values_list("date", flat=True)),
+            [date(2025, 3, 10), date(2025, 3, 11), date(2025, 3, 12)],
+        )
+        self.assertEqual(self.on_leave(), [1, 1, 1])
+        self.assertTrue(Notification.objects.filter(recipient=self.member, subject="Leave Request Approved").exists())
+
+        self.decide("reject")
+        self.assertFalse(LeaveDay.objects.filter(leave=self.leave).exists())
+        self.assertEqual(self.on_leave(), [0, 0, 0])
+
+    def test_dashboard_reads_on_leave_today_from_the_rollup(self):
+        today = timezone.localdate()
+        self.leave.start_date = self.leave.end_date = today
+        self.leave.save()
+        self.decide("approve")
+        response = self.client.get(reverse("admin_dashboard"))
+        self.assertEqual(response.context["on_leave_today"], 1)
+        self.assertEqual(DailyAttendanceSummary.objects.get(date=today).on_leave, 1)
 
-# Create your tests here.
+    def test_a_failed_rollup_refresh_leaves_nothing_half_done(self):
+        with mock.patch("adminpanel.views.refresh_daily_summaries", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.decide("approve")
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.status, "pending")
+        self.assertFalse(LeaveDay.objects.filter(leave=self.leave).exists())
+        self.assertFalse(Notification.objects.filter(recipient=self.member).exists())
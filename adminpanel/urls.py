@@ -1,13 +1,15 @@
 # adminpanel/urls.py
 from django.urls import path
+from core.concurrency import pick_view
 from . import views
 
 # app_name = "adminpanel"
 
 urlpatterns = [
-    path("dashboard/", views.admin_dashboard, name="admin_dashboard"),
+    path("dashboard/", pick_view(views.admin_dashboard, views.admin_dashboard_async), name="admin_dashboard"),
     path("staff/manage/", views.manage_staff, name="manage_staff"),
     path("staff/edit/<int:staff_id>/", views.edit_staff, name="edit_staff"),
     path("leave-requests/", views.leave_requests, name="leave_requests"),
     path("send-invite/", views.send_staff_invite, name="send_staff_invite"),
+    path("send-invite/bulk/", views.bulk_staff_invite, name="bulk_staff_invite"),
 ]
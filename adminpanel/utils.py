@@ -0,0 +1,150 @@
+# adminpanel/utils.py
+import csv
+import io
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.urls import reverse
+
+from accounts.models import StaffInvitation, User
+from core.mail import queue_emails
+
+
+# ===================================
+# ✉️ Invitation emails
+# ===================================
+def invite_link(token, request=None):
+    """Absolute registration URL for an invitation token."""
+    path = reverse("staff_register", args=[token])
+    if request is not None:
+        return request.build_absolute_uri(path)
+    # Outside a request (management commands), fall back to the configured domain
+    return f"{getattr(settings, 'DOMAIN', 'http://localhost:8000')}{path}"
+
+
+def invitation_email(invitation, request=None):
+    """The invitation email for queue_email()/queue_emails()."""
+    link = invite_link(invitation.token, request)
+    return {
+        "subject": "You are invited to join StaffHub 🎉",
+        "body": f"You have been invited to join StaffHub.\nClick the link to register:\n{link}",
+        "html_body": f"""
+                <p>Hello,</p>
+                <p>You have been invited to join <strong>StaffHub</strong>.</p>
+                <p><a href="{link}" style="background:#0d6efd;color:#fff;padding:10px 15px;border-radius:6px;text-decoration:none;">Register Now</a></p>
+                <p>If the button doesn’t work, copy and paste this link: {link}</p>
+                <br><p>Best regards,<br>StaffHub Team</p>
+            """,
+        "to": [invitation.email],
+    }
+
+
+# ===================================
+# 📨 Bulk staff invitations
+# ===================================
+BULK_INVITE_MAX_ROWS = getattr(settings, "BULK_INVITE_MAX_ROWS", 2000)
+# Emails per IN (...) lookup, well under SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+INVITED = "invited"
+INVALID = "invalid"
+DUPLICATE = "duplicate"
+REGISTERED = "registered"
+ALREADY_INVITED = "already_invited"
+
+
+def parse_invite_rows(text):
+    """
+    Email addresses from a CSV upload or a pasted list, one per row.
+
+    The email is the first column, so a CSV export with extra columns
+    works as is; blank rows and an "email" header row are skipped.
+    Returns (row number, address) pairs, numbered as in the input.
+    """
+    rows = []
+    for number, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+        address = row[0].strip() if row else ""
+        if not address or (number == 1 and address.lower() == "email"):
+            continue
+        rows.append((number, address))
+    return rows
+
+
+def _existing(queryset, keys):
+    """Lower-cased emails from `keys` that the queryset already has, in a few IN (...) lookups."""
+    keys = list(keys)
+    found = set()
+    queryset = queryset.annotate(email_key=Lower("email"))
+    for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        found.update(queryset.filter(email_key__in=keys[i:i + LOOKUP_CHUNK_SIZE]).values_list("email_key", flat=True))
+    return found
+
+
+def bulk_invite(rows, request=None):
+    """
+    Invite every new address in `rows` (from parse_invite_rows) at once.
+
+    Addresses are checked against existing users and invitations with
+    set-based lookups (case-insensitively), the invitations are inserted
+    with one bulk_create and their emails queued with one bulk insert into
+    the outbox, which the worker delivers over a single SMTP connection.
+    Returns one result per row: {"row", "email", "status", "message"},
+    with status one of invited, invalid, duplicate, registered or
+    already_invited.
+    """
+    if len(rows) > BULK_INVITE_MAX_ROWS:
+        raise ValueError(f"At most {BULK_INVITE_MAX_ROWS} addresses can be invited at once.")
+
+    results, candidates = [], {}
+    for number, address in rows:
+        result = {"row": number, "email": address, "status": INVITED, "message": ""}
+        results.append(result)
+        try:
+            validate_email(address)
+        except ValidationError:
+            result.update(status=INVALID, message="Not a valid email address.")
+            continue
+        key = address.lower()
+        if key in candidates:
+            result.update(status=DUPLICATE, message=f"Same address as row {candidates[key]['row']}.")
+            continue
+        candidates[key] = result
+
+    registered = _existing(User.objects.all(), candidates)
+    invited = _existing(StaffInvitation.objects.all(), candidates.keys() - registered)
+    for key, result in candidates.items():
+        if key in registered:
+            result.update(status=REGISTERED, message="Already has an account.")
+        elif key in invited:
+            result.update(status=ALREADY_INVITED, message="Already invited.")
+
+    new = {key: result for key, result in candidates.items() if result["status"] == INVITED}
+    if new:
+        invitations = [
+            StaffInvitation(email=User.objects.normalize_email(result["email"]), token=uuid.uuid4())
+            for result in new.values()
+        ]
+        with transaction.atomic():
+            # A concurrent invite of the same address loses to the unique email, not with an error
+            StaffInvitation.objects.bulk_create(invitations, batch_size=500, ignore_conflicts=True)
+            # Rows skipped by ignore_conflicts get no id back, so look the tokens up
+            tokens = [invitation.token for invitation in invitations]
+            created = set()
+            for i in range(0, len(tokens), LOOKUP_CHUNK_SIZE):
+                created.update(
+                    StaffInvitation.objects.filter(token__in=tokens[i:i + LOOKUP_CHUNK_SIZE])
+                    .values_list("token", flat=True)
+                )
+            invitations = [invitation for invitation in invitations if invitation.token in created]
+            queue_emails(invitation_email(invitation, request) for invitation in invitations)
+
+        created_keys = {invitation.email.lower() for invitation in invitations}
+        for key, result in new.items():
+            if key not in created_keys:
+                result.update(status=ALREADY_INVITED, message="Already invited.")
+
+    return results
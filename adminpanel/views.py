@@ -1,18 +1,21 @@
 from uuid import uuid4
-from datetime import date
+from functools import partial
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
 from accounts.models import StaffInvitation, User
-from attendance.models import Attendance
+from attendance.utils import daily_summaries, refresh_daily_summaries
+from core.concurrency import gather_queries, run_queries
 from leave.models import Leave
-from .forms import StaffInvitationForm, StaffForm
+from leave.utils import sync_leave_days
+from .forms import BulkInvitationForm, StaffInvitationForm, StaffForm
+from .utils import BULK_INVITE_MAX_ROWS, INVITED, bulk_invite, invitation_email, parse_invite_rows
 
 from uuid import uuid4
-from django.core.mail import EmailMultiAlternatives
-from django.conf import settings
+from core.mail import queue_email
 
 from .forms import StaffInvitationForm
 
@@ -39,28 +42,7 @@ def send_staff_invite(request):
             invitation.token = uuid4()
             invitation.save()
 
-            # Generate full URL
-            invite_link = request.build_absolute_uri(f"/accounts/register/{invitation.token}/")
-
-            # Email content
-            subject = "You are invited to join StaffHub 🎉"
-            text_message = f"You have been invited to join StaffHub.\nClick the link to register:\n{invite_link}"
-            html_message = f"""
-                <p>Hello,</p>
-                <p>You have been invited to join <strong>StaffHub</strong>.</p>
-                <p><a href="{invite_link}" style="background:#0d6efd;color:#fff;padding:10px 15px;border-radius:6px;text-decoration:none;">Register Now</a></p>
-                <p>If the button doesn’t work, copy and paste this link: {invite_link}</p>
-                <br><p>Best regards,<br>StaffHub Team</p>
-            """
-
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[invitation.email],
-            )
-            email.attach_alternative(html_message, "text/html")
-            email.send()
+            queue_email(**invitation_email(invitation, request))
 
             messages.success(request, f"Invitation sent to {invitation.email}.")
             return redirect("send_staff_invite")
@@ -81,19 +63,42 @@ def send_staff_invite(request):
     return render(request, "adminpanel/send_invite.html", context)
 
 
-from datetime import timedelta, date
-from django.db.models import Count, Q
-
 @login_required
-def admin_dashboard(request):
-    """Admin dashboard with stats overview and attendance trends by percentage."""
+def bulk_staff_invite(request):
+    """Invite many staff at once from a CSV upload or a pasted list, with a per-row report."""
     if not request.user.is_admin_user():
-        messages.error(request, "You do not have access to the admin dashboard.")
+        messages.error(request, "Access denied. Admin privileges required.")
         return redirect("home")
 
-    today = date.today()
-    total_staff = User.objects.filter(role="staff").count()
-    today_attendance = Attendance.objects.filter(date=today)
+    results = None
+    if request.method == "POST":
+        form = BulkInvitationForm(request.POST, request.FILES)
+        if form.is_valid():
+            rows = parse_invite_rows(form.cleaned_data["text"])
+            if len(rows) > BULK_INVITE_MAX_ROWS:
+                form.add_error(None, f"At most {BULK_INVITE_MAX_ROWS} addresses can be invited at once.")
+            else:
+                results = bulk_invite(rows, request)
+                invited = sum(result["status"] == INVITED for result in results)
+                # Emails go out from the outbox worker, not in this request
+                messages.success(request, f"{invited} of {len(results)} invitation(s) queued.")
+    else:
+        form = BulkInvitationForm()
+
+    return render(request, "adminpanel/bulk_invite.html", {
+        "form": form,
+        "results": results,
+        "max_rows": BULK_INVITE_MAX_ROWS,
+    })
+
+
+from datetime import timedelta
+from django.db.models import Count, Q
+from django.utils import timezone
+
+def _admin_dashboard_queries(request):
+    """The dashboard's independent queries, and the context built from their results."""
+    today = timezone.localdate()
 
     # --- Attendance Chart Range ---
     range_option = request.GET.get("range", "7")  # default 7 days
@@ -101,39 +106,61 @@ def admin_dashboard(request):
         range_days = int(range_option)
     except ValueError:
         range_days = 7
-
+    range_days = max(range_days, 1)
     start_date = today - timedelta(days=range_days - 1)
-    date_list = [start_date + timedelta(days=i) for i in range(range_days)]
-    chart_labels = [d.strftime("%b %d") for d in date_list]
 
-    trend_present = []
-    trend_absent = []
-    trend_late = []
+    queries = [
+        User.objects.filter(role="staff").count,
+        # One range scan over the daily rollup covers the chart and today's cards
+        partial(daily_summaries, start_date, today),
+        Leave.objects.filter(status="pending").count,
+        # Recent leaves
+        partial(list, Leave.objects.select_related("staff").order_by("-applied_at")[:5]),
+    ]
+
+    def context(total_staff, summaries, pending_leaves, recent_leaves):
+        today_summary = summaries[-1]
+        return {
+            "total_staff": total_staff,
+            "present_today": today_summary.present,
+            "absent_today": today_summary.absent,
+            "late_today": today_summary.late,
+            "on_leave_today": today_summary.on_leave,
+            "pending_leaves": pending_leaves,
+            "recent_leaves": recent_leaves,
+            "chart_labels": [s.date.strftime("%b %d") for s in summaries],
+            "trend_present": [s.percentage("present") for s in summaries],
+            "trend_absent": [s.percentage("absent") for s in summaries],
+            "trend_late": [s.percentage("late") for s in summaries],
+            "trend_on_leave": [s.percentage("on_leave") for s in summaries],
+            "selected_range": range_days,
+        }
+
+    return queries, context
+
+
+@login_required
+def admin_dashboard(request):
+    """Admin dashboard with stats overview and attendance trends by percentage."""
+    if not request.user.is_admin_user():
+        messages.error(request, "You do not have access to the admin dashboard.")
+        return redirect("home")
+
+    queries, context = _admin_dashboard_queries(request)
+    return render(request, "dashboard/admin_dashboard.html", context(*run_queries(*queries)))
 
-    for d in date_list:
-        records = Attendance.objects.filter(date=d)
-        # Calculate percentage based on total staff
-        trend_present.append(round((records.filter(status="present").count() / total_staff) * 100, 2) if total_staff else 0)
-        trend_absent.append(round((records.filter(status="absent").count() / total_staff) * 100, 2) if total_staff else 0)
-        trend_late.append(round((records.filter(status="late").count() / total_staff) * 100, 2) if total_staff else 0)
 
-    # Recent leaves
-    recent_leaves = Leave.objects.order_by("-applied_at")[:5]
+@login_required
+async def admin_dashboard_async(request):
+    """admin_dashboard for ASGI, running its queries concurrently."""
+    user = await request.auser()
+    if not user.is_admin_user():
+        messages.error(request, "You do not have access to the admin dashboard.")
+        return redirect("home")
 
-    context = {
-        "total_staff": total_staff,
-        "present_today": today_attendance.filter(status="present").count(),
-        "absent_today": today_attendance.filter(status="absent").count(),
-        "late_today": today_attendance.filter(status="late").count(),
-        "pending_leaves": Leave.objects.filter(status="pending").count(),
-        "recent_leaves": recent_leaves,
-        "chart_labels": chart_labels,
-        "trend_present": trend_present,
-        "trend_absent": trend_absent,
-        "trend_late": trend_late,
-        "selected_range": range_days,
-    }
-    return render(request, "dashboard/admin_dashboard.html", context)
+    queries, context = _admin_dashboard_queries(request)
+    context = context(*await gather_queries(*queries))
+    return await sync_to_async(render)(request, "dashboard/admin_dashboard.html", context)
 
 
 @login_required
@@ -172,6 +199,31 @@ def edit_staff(request, staff_id):
 
 from leave.utils import send_leave_notification
 from django.core.paginator import Paginator
+from django.db import transaction
+
+# action posted from the leave requests page -> the status it sets
+LEAVE_DECISIONS = {"approve": "approved", "reject": "rejected"}
+
+
+def _notify_leave_decision(request, leave, status):
+    """On-site notification and email telling the staff member their leave was approved/rejected."""
+    try:
+        send_leave_notification(
+            sender=request.user,
+            recipient=leave.staff,
+            subject=f"Leave Request {status.title()}",
+            message=(
+                f"Your leave request ({leave.leave_type}) from {leave.start_date} "
+                f"to {leave.end_date} has been {status}."
+            ),
+            request=request  # optional on-site notification
+        )
+    except Exception:
+        messages.warning(
+            request,
+            "Leave status updated, but failed to send notification. Error logged."
+        )
+
 
 @login_required
 def leave_requests(request):
@@ -187,8 +239,8 @@ def leave_requests(request):
         return redirect("home")
 
     # Querysets
-    pending_leaves_qs = Leave.objects.filter(status="pending").order_by("-applied_at")
-    approved_leaves_qs = Leave.objects.filter(status="approved").order_by("-applied_at")
+    pending_leaves_qs = Leave.objects.filter(status="pending").select_related("staff").order_by("-applied_at")
+    approved_leaves_qs = Leave.objects.filter(status="approved").select_related("staff").order_by("-applied_at")
 
     # Pagination: 5 per page
     pending_paginator = Paginator(pending_leaves_qs, 5)
@@ -206,48 +258,23 @@ def leave_requests(request):
         action = request.POST.get("action")
         leave = get_object_or_404(Leave, id=leave_id)
 
-        try:
-            if action == "approve":
-                leave.status = "approved"
+        if action in LEAVE_DECISIONS:
+            status = LEAVE_DECISIONS[action]
+            # The status, its per-day rows and the daily rollup change together or not at all
+            with transaction.atomic():
+                leave.status = status
                 leave.save()
-                messages.success(request, f"Leave request for {leave.staff.get_full_name()} approved.")
+                sync_leave_days(leave)
+                refresh_daily_summaries(leave.start_date, leave.end_date)
+                # Notify staff once the decision is committed
+                transaction.on_commit(partial(_notify_leave_decision, request, leave, status))
 
-                # Notify staff
-                send_leave_notification(
-                    sender=request.user,
-                    recipient=leave.staff,
-                    subject="Leave Request Approved",
-                    message=(
-                        f"Your leave request ({leave.leave_type}) from {leave.start_date} "
-                        f"to {leave.end_date} has been approved."
-                    ),
-                    request=request  # optional on-site notification
-                )
-
-            elif action == "reject":
-                leave.status = "rejected"
-                leave.save()
-                messages.info(request, f"Leave request for {leave.staff.get_full_name()} rejected.")
-
-                # Notify staff
-                send_leave_notification(
-                    sender=request.user,
-                    recipient=leave.staff,
-                    subject="Leave Request Rejected",
-                    message=(
-                        f"Your leave request ({leave.leave_type}) from {leave.start_date} "
-                        f"to {leave.end_date} has been rejected."
-                    ),
-                    request=request
-                )
+            if status == "approved":
+                messages.success(request, f"Leave request for {leave.staff.get_full_name()} approved.")
             else:
-                messages.error(request, "Invalid action provided for leave request.")
-
-        except Exception:
-            messages.warning(
-                request,
-                "Leave status updated, but failed to send notification. Error logged."
-            )
+                messages.info(request, f"Leave request for {leave.staff.get_full_name()} rejected.")
+        else:
+            messages.error(request, "Invalid action provided for leave request.")
 
         return redirect("leave_requests")
 
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Holiday, ShiftPolicy
+
+
+@admin.register(ShiftPolicy)
+class ShiftPolicyAdmin(admin.ModelAdmin):
+    list_display = ("name", "location", "start_time", "grace_minutes", "weekdays", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("name", "location")
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ("date", "name", "location")
+    list_filter = ("location",)
+    date_hierarchy = "date"
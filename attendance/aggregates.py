@@ -0,0 +1,76 @@
+# attendance/aggregates.py
+from datetime import timedelta
+
+from django.db.models import Count, Q
+
+from .models import Attendance
+
+STATUSES = [status for status, _ in Attendance.STATUS_CHOICES]
+
+
+def status_counts(queryset):
+    """
+    Count every attendance status for the queryset in a single query.
+
+    Returns a dict such as {"total": 12, "present": 8, "absent": 1, "late": 3}.
+    """
+    return queryset.order_by().aggregate(
+        total=Count("id"),
+        **{status: Count("id", filter=Q(status=status)) for status in STATUSES},
+    )
+
+
+def month_bounds(day):
+    """First day of the day's month and first day of the following month."""
+    first = day.replace(day=1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return first, following
+
+
+def attendance_summary(queryset, today):
+    """
+    Overall status counts plus this month's totals in a single query.
+
+    The month is matched as a date range so the (staff, date) index applies.
+    """
+    first, following = month_bounds(today)
+    in_month = Q(date__gte=first, date__lt=following)
+    summary = queryset.order_by().aggregate(
+        total=Count("id"),
+        month_total=Count("id", filter=in_month),
+        month_present=Count("id", filter=in_month & Q(status="present")),
+        **{status: Count("id", filter=Q(status=status)) for status in STATUSES},
+    )
+    summary["month_percentage"] = (
+        round((summary["month_present"] / summary["month_total"]) * 100, 1)
+        if summary["month_total"] else 0
+    )
+    return summary
+
+
+def daily_trend(queryset, start_date=None, end_date=None):
+    """
+    Per-day status counts from one GROUP BY query.
+
+    With both bounds every day in the range is returned (missing days as
+    zeros); otherwise only the days that have records. Returns a dict keyed
+    by date, in date order, of {"present": n, "absent": n, "late": n}.
+    """
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+
+    rows = (
+        queryset.order_by("date")
+        .values("date")
+        .annotate(**{status: Count("id", filter=Q(status=status)) for status in STATUSES})
+    )
+
+    trend = {}
+    if start_date and end_date:
+        for i in range((end_date - start_date).days + 1):
+            trend[start_date + timedelta(days=i)] = {status: 0 for status in STATUSES}
+    for row in rows:
+        trend[row["date"]] = {status: row[status] for status in STATUSES}
+    return trend
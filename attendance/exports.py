@@ -0,0 +1,40 @@
+# attendance/exports.py
+from core.exports import EXPORT_CHUNK_SIZE
+from .models import Attendance
+
+HEADERS = ["Staff", "Email", "Date", "Status"]
+FILENAME = "attendance_report"
+SHEET_TITLE = "Attendance Report"
+FILTER_FIELDS = ["staff", "start_date", "end_date"]
+
+
+def filtered_records(params):
+    """Attendance records matching the report filters (staff, start_date, end_date)."""
+    records = Attendance.objects.all().order_by("staff", "-date")
+
+    staff_email = params.get("staff")
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+
+    if staff_email:
+        records = records.filter(staff__email=staff_email)
+    if start_date:
+        records = records.filter(date__gte=start_date)
+    if end_date:
+        records = records.filter(date__lte=end_date)
+    return records
+
+
+def row_count(params):
+    """Number of rows an export with these filters will contain."""
+    return filtered_records(params).count()
+
+
+def export_rows(params, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one export row per record, fetching staff columns in the same query."""
+    rows = filtered_records(params).values_list(
+        "staff__first_name", "staff__last_name", "staff__email", "date", "status"
+    )
+    for first_name, last_name, email, day, status in rows.iterator(chunk_size=chunk_size):
+        full_name = f"{first_name} {last_name}".strip() or email
+        yield [full_name, email, day, status]
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.utils import refresh_daily_summaries
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily attendance rollup (DailyAttendanceSummary) for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First day to rebuild (YYYY-MM-DD). Defaults to the earliest attendance record.")
+        parser.add_argument("--end", help="Last day to rebuild (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument("--chunk-days", type=int, default=90, help="Number of days rebuilt per batch.")
+
+    def handle(self, *args, **options):
+        end = parse_date(options["end"]) if options["end"] else timezone.localdate()
+        if options["start"]:
+            start = parse_date(options["start"])
+        else:
+            start = Attendance.objects.aggregate(first=Min("date"))["first"] or end
+
+        if start > end:
+            raise CommandError("--start must be on or before --end.")
+
+        chunk_days = max(options["chunk_days"], 1)
+        total = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            total += len(refresh_daily_summaries(chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} daily summaries ({start} to {end})."))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from attendance.utils import mark_absentees
+from .backfill_attendance_summary import parse_date
+
+
+class Command(BaseCommand):
+    help = "Record staff who neither marked attendance nor were on approved leave as absent"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Single day to process (YYYY-MM-DD). Defaults to yesterday.")
+        parser.add_argument("--start", help="First day of a range to process (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last day of a range to process (YYYY-MM-DD). Defaults to yesterday.")
+        parser.add_argument("--include-weekends", action="store_true", help="Also mark absences outside each shift's weekdays (holidays are still skipped).")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+
+        if options["date"]:
+            if options["start"] or options["end"]:
+                raise CommandError("Use either --date or --start/--end, not both.")
+            start = end = parse_date(options["date"])
+        else:
+            end = parse_date(options["end"]) if options["end"] else yesterday
+            start = parse_date(options["start"]) if options["start"] else end
+
+        if start > end:
+            raise CommandError("--start must be on or before --end.")
+        if end > today:
+            raise CommandError("Cannot mark absences for future days.")
+
+        inserted = mark_absentees(start, end, include_weekends=options["include_weekends"])
+        self.stdout.write(self.style.SUCCESS(f"Marked {inserted} absences ({start} to {end})."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from attendance.utils import reclassify_attendance
+from .backfill_attendance_summary import parse_date
+
+
+class Command(BaseCommand):
+    help = "Re-apply the current shift policies to present/late records (run after changing a policy or holiday)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First day to reclassify (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last day to reclassify (YYYY-MM-DD). Defaults to today.")
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"])
+        end = parse_date(options["end"]) if options["end"] else timezone.localdate()
+        if start > end:
+            raise CommandError("--start must be on or before --end.")
+
+        changed = reclassify_attendance(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Reclassified {changed} records ({start} to {end})."))
@@ -1,4 +1,7 @@
+from datetime import datetime, time, timedelta
+
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 
 class Attendance(models.Model):
@@ -9,12 +12,95 @@ class Attendance(models.Model):
     )
 
     staff = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'staff'})
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(default=timezone.localdate)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="present")
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('staff', 'date')  # Ensure one record per day per staff
+        unique_together = ('staff', 'date')  # Ensure one record per day per staff (also indexes staff + date ranges)
+        indexes = [
+            # Daily status counts (admin dashboard, reports, rollup rebuilds)
+            models.Index(fields=["date", "status"], name="attendance_date_status_idx"),
+            # Attendance report pages, keyset-paginated by staff then newest first; the
+            # unique (staff, date) index runs the other way, so pages would be sorted
+            models.Index(fields=["staff", "-date"], name="attendance_staff_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.staff.username} - {self.date} - {self.status}"
+
+
+class DailyAttendanceSummary(models.Model):
+    """Per-day rollup of attendance counts, read by dashboards and reports."""
+
+    date = models.DateField(unique=True)
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    on_leave = models.PositiveIntegerField(default=0)
+    total_staff = models.PositiveIntegerField(default=0)  # Staff headcount on that day
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date"]
+
+    def percentage(self, status):
+        """Share of the day's staff headcount with the given status."""
+        if not self.total_staff:
+            return 0
+        return round((getattr(self, status) / self.total_staff) * 100, 2)
+
+    def __str__(self):
+        return f"{self.date} - P:{self.present} L:{self.late} A:{self.absent} OL:{self.on_leave}"
+
+
+def default_workdays():
+    return [0, 1, 2, 3, 4]  # Monday to Friday
+
+
+class ShiftPolicy(models.Model):
+    """When staff at a location are expected to check in, and on which weekdays."""
+
+    name = models.CharField(max_length=100)
+    # Matches User.location; a blank location applies to staff without a more specific policy
+    location = models.CharField(max_length=100, blank=True, default="")
+    weekdays = models.JSONField(default=default_workdays, help_text="Working weekdays, 0 = Monday ... 6 = Sunday")
+    start_time = models.TimeField(default=time(8, 0))
+    grace_minutes = models.PositiveSmallIntegerField(default=10)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["location", "name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["location"], condition=models.Q(is_active=True), name="shift_policy_active_location_unique"
+            ),
+        ]
+
+    def works_on(self, day):
+        return day.weekday() in self.weekdays
+
+    @property
+    def late_after(self):
+        """Latest check-in time that still counts as present."""
+        start = datetime.combine(datetime.min, self.start_time)
+        return (start + timedelta(minutes=self.grace_minutes)).time()
+
+    def __str__(self):
+        return f"{self.name} ({self.location or 'all locations'})"
+
+
+class Holiday(models.Model):
+    """A day off: nobody is late or absent. A blank location applies everywhere."""
+
+    date = models.DateField()
+    name = models.CharField(max_length=100)
+    location = models.CharField(max_length=100, blank=True, default="")
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ("date", "location")
+
+    def __str__(self):
+        return f"{self.date} - {self.name} ({self.location or 'all locations'})"
@@ -0,0 +1,129 @@
+# attendance/policies.py
+import threading
+import time as clock
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Holiday, ShiftPolicy
+
+# Seconds a process keeps its snapshot before re-reading policies and holidays
+POLICY_CACHE_TTL = 300
+# Bumped on every change so processes sharing the cache drop their snapshot early
+POLICY_VERSION_KEY = "attendance:policies:version"
+# Seconds a process trusts its snapshot's version before reading POLICY_VERSION_KEY again
+POLICY_VERSION_TTL = 5
+
+# Applies when no active policy matches: 08:00 start, 10 minutes grace, Monday to Friday
+DEFAULT_POLICY = ShiftPolicy(name="Default")
+
+Snapshot = namedtuple("Snapshot", ["loaded_at", "checked_at", "version", "policies", "holidays"])
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+# ===================================
+# 🗄️ In-process snapshot
+# ===================================
+def _load(version):
+    policies = {policy.location: policy for policy in ShiftPolicy.objects.filter(is_active=True)}
+    holidays = {}
+    for day, location in Holiday.objects.values_list("date", "location"):
+        holidays.setdefault(day, set()).add(location)
+    now = clock.monotonic()
+    return Snapshot(now, now, version, policies, holidays)
+
+
+def _current():
+    """
+    Active policies and holidays, re-read only after a change or when the TTL lapses.
+
+    Changes made in this process drop the snapshot at once; changes made
+    elsewhere are seen within POLICY_VERSION_TTL seconds, so most lookups
+    touch neither the database nor the cache.
+    """
+    global _snapshot
+    now = clock.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and now - snapshot.loaded_at <= getattr(
+        settings, "ATTENDANCE_POLICY_CACHE_TTL", POLICY_CACHE_TTL
+    ):
+        if now - snapshot.checked_at <= getattr(settings, "ATTENDANCE_POLICY_VERSION_TTL", POLICY_VERSION_TTL):
+            return snapshot
+        version = cache.get(POLICY_VERSION_KEY, 0)
+        if version == snapshot.version:
+            _snapshot = snapshot = snapshot._replace(checked_at=now)
+            return snapshot
+    else:
+        version = cache.get(POLICY_VERSION_KEY, 0)
+
+    with _lock:
+        snapshot = _snapshot = _load(version)
+    return snapshot
+
+
+def invalidate_policies():
+    """Drop this process's snapshot and tell processes sharing the cache to drop theirs."""
+    global _snapshot
+    _snapshot = None
+    try:
+        cache.incr(POLICY_VERSION_KEY)
+    except ValueError:
+        cache.set(POLICY_VERSION_KEY, 1, None)
+
+
+# ===================================
+# 🕗 Resolution
+# ===================================
+def policy_for(location):
+    """The active policy for a location, falling back to the all-locations one."""
+    policies = _current().policies
+    return policies.get(location or "") or policies.get("") or DEFAULT_POLICY
+
+
+def is_holiday(day, location=None):
+    locations = _current().holidays.get(day, ())
+    return "" in locations or (bool(location) and location in locations)
+
+
+def is_working_day(day, location=None):
+    """Whether staff at the location are expected in on that day."""
+    return not is_holiday(day, location) and policy_for(location).works_on(day)
+
+
+def classify_check_in(local_time, location=None):
+    """
+    "present" or "late" for a check-in at the given local datetime.
+
+    Check-ins on holidays or outside the shift's weekdays are never late.
+    """
+    day = local_time.date()
+    if not is_working_day(day, location):
+        return "present"
+    return "present" if local_time.time() <= policy_for(location).late_after else "late"
+
+
+def expected_staff_filter(day, ignore_weekdays=False):
+    """
+    Q matching staff expected at work on the day, by User.location, or None
+    when nobody is (an all-locations holiday).
+    """
+    snapshot = _current()
+    holiday_locations = snapshot.holidays.get(day, set())
+    if "" in holiday_locations:
+        return None
+
+    general = snapshot.policies.get("") or DEFAULT_POLICY
+    specific = sorted(location for location in snapshot.policies if location)
+    working = [
+        location for location in specific
+        if location not in holiday_locations and (ignore_weekdays or snapshot.policies[location].works_on(day))
+    ]
+
+    expected = Q(location__in=working)
+    if ignore_weekdays or general.works_on(day):
+        expected |= ~Q(location__in=sorted(set(specific) | holiday_locations))
+    return expected
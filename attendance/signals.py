@@ -0,0 +1,15 @@
+# attendance/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Holiday, ShiftPolicy
+from .policies import invalidate_policies
+
+
+@receiver(post_save, sender=ShiftPolicy)
+@receiver(post_delete, sender=ShiftPolicy)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def policy_changed(sender, instance, **kwargs):
+    """Any policy or holiday change drops the cached snapshot used by check-ins."""
+    invalidate_policies()
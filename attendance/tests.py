@@ -1,3 +1,352 @@
+import io
+import random
+from collections import Counter
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.factories import make_attendance, make_leaves, make_staff
+from core.testing import QueryBudgetTestCase
+from leave.models import Leave, LeaveDay
+from leave.utils import sync_leave_days
+
+from . import policies
+from .models import Attendance, DailyAttendanceSummary, Holiday, ShiftPolicy
+from .policies import DEFAULT_POLICY, POLICY_VERSION_KEY, classify_check_in, invalidate_policies, policy_for
+from .utils import check_in, mark_absentees, reclassify_attendance, refresh_daily_summaries
+
+
+class AttendanceQueryBudgetTests(QueryBudgetTestCase):
+    def reports(self):
+        return [
+            reverse("attendance_report"),
+            reverse("attendance_report_rows"),
+            reverse("attendance_export", args=["csv"]),
+            reverse("attendance_export", args=["xlsx"]),
+        ]
+
+    def test_admin(self):
+        report, rows, csv_export, xlsx_export = self.reports()
+        staff_filter = f"?staff={self.member.email}"
+        self.assertBudgets(self.admin, {
+            reverse("mark_attendance"): 2,
+            report: 7,
+            report + staff_filter: 9,
+            rows: 3,
+            # Everyone's year of attendance is queued as a background export
+            csv_export: 6,
+            xlsx_export: 6,
+            # One staff member's is generated in the request
+            csv_export + staff_filter: 4,
+            xlsx_export + staff_filter: 4,
+        })
+
+    def test_staff(self):
+        budgets = {url: 2 for url in self.reports()}
+        budgets[reverse("mark_attendance")] = 5
+        self.assertBudgets(self.member, budgets)
+
+    def test_anonymous_is_turned_away(self):
+        self.assertBudgets(None, {url: 0 for url in [reverse("mark_attendance"), *self.reports()]})
+
+    def test_check_in(self):
+        Attendance.objects.filter(staff=self.member, date=self.data.end_date).delete()
+        self.assertQueryBudget(8, self.member, reverse("mark_attendance"), method="post")
+        self.assertTrue(Attendance.objects.filter(staff=self.member, date=self.data.end_date).exists())
+
+    def test_queries_do_not_grow_with_data(self):
+        for url in [reverse("attendance_report"), reverse("attendance_report_rows")]:
+            with self.subTest(url=url):
+                self.assertQueriesDoNotGrow(self.admin, url)
+
+
+class MarkAbsenteesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = make_staff(4)
+        today = timezone.localdate()
+        # Monday of last week, and that week's Sunday
+        cls.monday = today - timedelta(days=today.weekday() + 7)
+        cls.sunday = cls.monday + timedelta(days=6)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_policies()
+
+    def absent_days(self, member=None):
+        records = Attendance.objects.filter(status="absent")
+        if member:
+            records = records.filter(staff=member)
+        return sorted(set(records.values_list("date", flat=True)))
+
+    def test_a_second_run_inserts_nothing(self):
+        self.assertEqual(mark_absentees(self.monday), 4)
+        self.assertEqual(mark_absentees(self.monday), 0)
+        self.assertEqual(Attendance.objects.filter(date=self.monday, status="absent").count(), 4)
+
+    def test_staff_on_approved_leave_are_skipped(self):
+        on_leave, pending = self.staff[:2]
+        for member, status in ((on_leave, "approved"), (pending, "pending")):
+            leave = Leave.objects.create(
+                staff=member, leave_type="sick", start_date=self.monday, end_date=self.monday,
+                reason="Flu", status=status,
+            )
+            sync_leave_days(leave)
+
+        self.assertEqual(mark_absentees(self.monday), 3)
+        self.assertFalse(Attendance.objects.filter(staff=on_leave).exists())
+        self.assertEqual(self.absent_days(pending), [self.monday])
+
+    def test_holidays_and_weekends_are_skipped(self):
+        Holiday.objects.create(date=self.monday, name="Bank holiday")
+        tuesday_to_friday = [self.monday + timedelta(days=i) for i in range(1, 5)]
+
+        self.assertEqual(mark_absentees(self.monday, self.sunday), 4 * 4)
+        self.assertEqual(self.absent_days(), tuesday_to_friday)
+
+        # Weekends can be included; holidays never are
+        self.assertEqual(mark_absentees(self.monday, self.sunday, include_weekends=True), 2 * 4)
+        self.assertEqual(self.absent_days(), tuesday_to_friday + [self.sunday - timedelta(days=1), self.sunday])
+
+    def test_staff_who_checked_in_are_skipped(self):
+        checked_in = self.staff[0]
+        Attendance.objects.create(staff=checked_in, date=self.monday, status="late")
+
+        self.assertEqual(mark_absentees(self.monday), 3)
+        self.assertEqual(
+            list(Attendance.objects.filter(staff=checked_in).values_list("date", "status")),
+            [(self.monday, "late")],
+        )
+
+
+class CheckInTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = make_staff(1)[0]
+        today = timezone.localdate()
+        # Last week's Wednesday, a working day under the default policy (08:00 + 10 minutes grace)
+        cls.day = today - timedelta(days=today.weekday() + 5)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_policies()
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+
+    def counts(self):
+        summary = DailyAttendanceSummary.objects.get(date=self.day)
+        return {"present": summary.present, "late": summary.late, "absent": summary.absent}
+
+    def test_checking_in_twice_keeps_the_first_check_in(self):
+        self.assertEqual(check_in(self.member, self.at(7, 55)), ("present", True))
+        # The second submit conflicts on (staff, date) and reports the first
+        self.assertEqual(check_in(self.member, self.at(9, 30)), ("present", False))
+        self.assertEqual(
+            list(Attendance.objects.filter(staff=self.member).values_list("date", "status")),
+            [(self.day, "present")],
+        )
+        self.assertEqual(self.counts(), {"present": 1, "late": 0, "absent": 0})
+
+    def test_pre_marked_absence_is_upgraded(self):
+        Attendance.objects.create(staff=self.member, date=self.day, status="absent")
+        mark_absentees(self.day)   # Builds the day's rollup with the absence
+        self.assertEqual(self.counts(), {"present": 0, "late": 0, "absent": 1})
+
+        self.assertEqual(check_in(self.member, self.at(9, 30)), ("late", True))
+        record = Attendance.objects.get(staff=self.member, date=self.day)
+        self.assertEqual((record.status, record.timestamp), ("late", self.at(9, 30)))
+        self.assertEqual(self.counts(), {"present": 0, "late": 1, "absent": 0})
+
+    def test_check_in_is_one_upsert_and_one_rollup_update(self):
+        refresh_daily_summaries(self.day)
+        classify_check_in(self.at(7, 55))   # Warms the policy cache
+
+        def statements(at):
+            with CaptureQueriesContext(connection) as queries:
+                result = check_in(self.member, at)
+            return result, [q["sql"].split()[0] for q in queries if "SAVEPOINT" not in q["sql"]]
+
+        self.assertEqual(statements(self.at(7, 55)), (("present", True), ["INSERT", "UPDATE"]))
+        self.assertEqual(statements(self.at(9, 30)), (("present", False), ["INSERT"]))
+
+    def test_double_submitted_check_in_marks_once(self):
+        self.client.force_login(self.member)
+        url = reverse("mark_attendance")
+        first = self.client.post(url, follow=True)
+        second = self.client.post(url, follow=True)
+        self.assertEqual(Attendance.objects.filter(staff=self.member, date=timezone.localdate()).count(), 1)
+        self.assertIn("has been marked", str(list(first.context["messages"])[0]))
+        self.assertIn("already marked", str(list(second.context["messages"])[0]))
+
+    def test_get_does_not_check_in(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse("mark_attendance"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Attendance.objects.filter(staff=self.member).exists())
+
+
+class ShiftPolicyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        # Last week's Wednesday
+        cls.day = today - timedelta(days=today.weekday() + 5)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_policies()
+
+    def at(self, hour, minute, second=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute, second)))
+
+    def test_location_policy_resolves_before_the_default(self):
+        self.assertIs(policy_for("Lagos"), DEFAULT_POLICY)
+        ShiftPolicy.objects.create(name="Everyone", start_time=time(9, 0))
+        ShiftPolicy.objects.create(name="Lagos office", location="Lagos", start_time=time(7, 0))
+        self.assertEqual(policy_for("Lagos").name, "Lagos office")
+        self.assertEqual(policy_for("Abuja").name, "Everyone")
+        self.assertEqual(policy_for("").name, "Everyone")
+
+    def test_lateness_at_the_grace_boundary(self):
+        # Default policy: 08:00 start, 10 minutes grace
+        self.assertEqual(classify_check_in(self.at(8, 10)), "present")
+        self.assertEqual(classify_check_in(self.at(8, 10, 1)), "late")
+
+        ShiftPolicy.objects.create(name="Lagos office", location="Lagos", start_time=time(7, 0), grace_minutes=0)
+        self.assertEqual(classify_check_in(self.at(7, 0), "Lagos"), "present")
+        self.assertEqual(classify_check_in(self.at(7, 1), "Lagos"), "late")
+        self.assertEqual(classify_check_in(self.at(7, 1), "Abuja"), "present")
+
+    def test_saving_a_policy_takes_effect_immediately(self):
+        policy = ShiftPolicy.objects.create(name="Everyone", start_time=time(9, 0))
+        self.assertEqual(classify_check_in(self.at(9, 5)), "present")
+        policy.start_time = time(8, 30)
+        policy.save()
+        self.assertEqual(classify_check_in(self.at(9, 5)), "late")
+
+    def test_changes_from_other_processes_arrive_through_the_version_key(self):
+        ShiftPolicy.objects.create(name="Everyone", start_time=time(9, 0))
+        self.assertEqual(policy_for("").start_time, time(9, 0))
+        now = policies.clock.monotonic()
+
+        # Another process changes the policy: it writes the row and bumps the shared version
+        ShiftPolicy.objects.update(start_time=time(8, 30))
+        cache.incr(POLICY_VERSION_KEY)
+
+        with mock.patch.object(policies.clock, "monotonic", return_value=now + 1):
+            # The version is not re-checked within POLICY_VERSION_TTL
+            self.assertEqual(policy_for("").start_time, time(9, 0))
+        with mock.patch.object(policies.clock, "monotonic", return_value=now + 10):
+            self.assertEqual(policy_for("").start_time, time(8, 30))
+
+    def test_version_is_checked_at_most_once_per_ttl(self):
+        policy_for("")
+        now = policies.clock.monotonic()
+        with mock.patch.object(policies, "cache", wraps=cache) as shared:
+            with mock.patch.object(policies.clock, "monotonic", return_value=now + 1):
+                for _ in range(100):
+                    policy_for("Lagos")
+            self.assertEqual(shared.get.call_count, 0)
+
+            with mock.patch.object(policies.clock, "monotonic", return_value=now + 10):
+                for _ in range(100):
+                    policy_for("Lagos")
+            self.assertEqual(shared.get.call_count, 1)
+
+
+class DailySummaryTests(TestCase):
+    """The rollup's counters always match what the raw attendance and leave rows say."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = make_staff(10, rng=random.Random(0))
+        today = timezone.localdate()
+        # Last week's Wednesday
+        cls.day = today - timedelta(days=today.weekday() + 5)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_policies()
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+
+    def raw_counts(self, day):
+        statuses = Counter(Attendance.objects.filter(date=day).values_list("status", flat=True))
+        return {
+            "present": statuses["present"],
+            "late": statuses["late"],
+            "absent": statuses["absent"],
+            # Staff on leave, counted once even when their leaves overlap
+            "on_leave": len(set(LeaveDay.objects.filter(date=day).values_list("staff_id", flat=True))),
+            "total_staff": len(self.staff),
+        }
+
+    def rollup_counts(self, day):
+        return DailyAttendanceSummary.objects.filter(date=day).values(
+            "present", "late", "absent", "on_leave", "total_staff"
+        ).get()
+
+    def assertRollupMatches(self, day, **expected):
+        rollup = self.rollup_counts(day)
+        self.assertEqual(rollup, self.raw_counts(day))
+        for status, count in expected.items():
+            self.assertEqual(rollup[status], count, status)
+
+    def test_check_ins_and_status_changes_move_the_right_counters(self):
+        refresh_daily_summaries(self.day)
+        self.assertRollupMatches(self.day, present=0, late=0, absent=0)
+
+        check_in(self.staff[0], self.at(7, 55))
+        self.assertRollupMatches(self.day, present=1, late=0)
+        check_in(self.staff[1], self.at(9, 0))
+        self.assertRollupMatches(self.day, present=1, late=1)
+
+        mark_absentees(self.day)
+        self.assertRollupMatches(self.day, present=1, late=1, absent=8)
+
+        # An absentee turns up late: absent -> late
+        check_in(self.staff[2], self.at(9, 30))
+        self.assertRollupMatches(self.day, present=1, late=2, absent=7)
+
+        # A later start time reclassifies the late check-ins as present
+        ShiftPolicy.objects.create(name="Everyone", start_time=time(9, 30))
+        reclassify_attendance(self.day)
+        self.assertRollupMatches(self.day, present=3, late=0, absent=7)
+
+    def test_inactive_staff_are_not_counted(self):
+        leaver = make_staff(1, prefix="leaver")[0]
+        leaver.is_active = False
+        leaver.save(update_fields=["is_active"])
+        mark_absentees(self.day)
+        # The ten active staff are all absent and the leaver is in neither count
+        self.assertRollupMatches(self.day, absent=10, total_staff=10)
+
+    def test_check_in_creates_a_missing_rollup_row(self):
+        check_in(self.staff[0], self.at(9, 0))
+        self.assertRollupMatches(self.day, present=0, late=1)
+
+    def test_backfill_matches_raw_attendance(self):
+        end = self.day
+        start = end - timedelta(days=45)
+        rng = random.Random(1)
+        make_attendance(self.staff, start, end, rng=rng)
+        make_leaves(self.staff, 3, start, end, rng=rng)
+        Attendance.objects.filter(date=end).delete()   # A day with leave but no attendance
 
-# Create your tests here.
+        call_command(
+            "backfill_attendance_summary", start=str(start), end=str(end), chunk_days=7, stdout=io.StringIO()
+        )
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        self.assertEqual(DailyAttendanceSummary.objects.count(), len(days))
+        for day in days:
+            with self.subTest(day=day):
+                self.assertEqual(self.rollup_counts(day), self.raw_counts(day))
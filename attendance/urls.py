@@ -1,12 +1,14 @@
 # attendance/urls.py
 from django.urls import path
+from core.concurrency import pick_view
 from . import views
 
 # app_name = "attendance"
 
 urlpatterns = [
     path("mark/", views.mark_attendance, name="mark_attendance"),
-    path("report/", views.attendance_report, name="attendance_report"),
+    path("report/", pick_view(views.attendance_report, views.attendance_report_async), name="attendance_report"),
+    path("report/rows/", views.attendance_report_rows, name="attendance_report_rows"),
     path("attendance-export/<str:file_type>/", views.attendance_export, name="attendance_export"),
 
     
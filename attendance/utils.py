@@ -0,0 +1,269 @@
+# attendance/utils.py
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.db.models import CharField, Count, DateField, DateTimeField, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from accounts.models import User
+from leave.models import LeaveDay
+from .aggregates import daily_trend
+from .models import Attendance, DailyAttendanceSummary
+from .policies import classify_check_in, expected_staff_filter
+
+SUMMARY_FIELDS = ["present", "late", "absent", "on_leave", "total_staff", "updated_at"]
+
+
+def date_range(start_date, end_date):
+    """List every date from start_date to end_date (inclusive)."""
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+def approved_leave_days(start_date, end_date):
+    """Map each day in the range to the ids of staff on approved leave that day."""
+    on_leave = {day: set() for day in date_range(start_date, end_date)}
+    for day, staff_id in LeaveDay.objects.filter(date__range=(start_date, end_date)).values_list("date", "staff_id"):
+        on_leave[day].add(staff_id)
+    return on_leave
+
+
+# ===================================
+# 📊 Daily attendance rollup
+# ===================================
+def refresh_daily_summaries(start_date, end_date=None):
+    """
+    Recompute the DailyAttendanceSummary rows for every day in the range.
+
+    Uses a fixed number of queries regardless of the range length:
+    one grouped attendance count, one leave-day range scan, one staff scan
+    and a single upsert.
+    """
+    end_date = end_date or start_date
+    days = date_range(start_date, end_date)
+
+    counts = daily_trend(Attendance.objects.all(), start_date, end_date)
+
+    # Staff on approved leave, expanded per day within the range
+    on_leave = approved_leave_days(start_date, end_date)
+
+    # Headcount snapshot: active staff who had joined by the end of each day,
+    # the same people mark_absentees expects to see
+    joined = sorted(
+        timezone.localdate(joined_at)
+        for joined_at in User.objects.filter(role="staff", is_active=True).values_list("date_joined", flat=True)
+    )
+
+    summaries = []
+    for day in days:
+        row = counts[day]
+        summaries.append(DailyAttendanceSummary(
+            date=day,
+            present=row["present"],
+            late=row["late"],
+            absent=row["absent"],
+            on_leave=len(on_leave[day]),
+            total_staff=bisect_right(joined, day),
+        ))
+
+    DailyAttendanceSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["date"],
+        update_fields=SUMMARY_FIELDS,
+        batch_size=500,
+    )
+    return summaries
+
+
+def record_check_in(day, status):
+    """
+    Count a check-in in the day's rollup row with one UPDATE.
+
+    The status counter goes up by one and the absent counter is re-counted
+    in the same statement (an index range scan over the day's few absences),
+    as the check-in may have replaced an absence. The row is rebuilt from
+    scratch only when it does not exist yet.
+    """
+    absences = (
+        Attendance.objects.filter(date=day, status="absent")
+        .order_by()
+        .values("date")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    updated = DailyAttendanceSummary.objects.filter(date=day).update(
+        updated_at=timezone.now(),
+        absent=Coalesce(Subquery(absences), 0),
+        **{status: F(status) + 1},
+    )
+    if not updated:
+        refresh_daily_summaries(day)
+
+
+def daily_summaries(start_date, end_date):
+    """
+    Return one summary per day in the range from a single range scan.
+
+    Days without a rollup row are filled with empty (unsaved) summaries.
+    """
+    existing = {
+        summary.date: summary
+        for summary in DailyAttendanceSummary.objects.filter(date__range=(start_date, end_date))
+    }
+    return [existing.get(day) or DailyAttendanceSummary(date=day) for day in date_range(start_date, end_date)]
+
+
+# ===================================
+# ✅ Check-in
+# ===================================
+def check_in(staff, at=None):
+    """
+    Record the staff member's check-in for the (local) day of `at`.
+
+    The status is decided by the staff member's shift policy from local
+    time before writing (the policy comes from an in-process cache, so no
+    query is spent on it). The record is written by a single upsert and the
+    rollup counter by one UPDATE, in one short transaction that starts with
+    a write so SQLite takes the write lock up front. An absence already
+    recorded for the day is upgraded. An earlier check-in is kept
+    untouched, so a double submit cannot turn "present" into "late".
+    Returns (status, marked), with marked False when the staff member had
+    already checked in.
+    """
+    at = at or timezone.now()
+    local = timezone.localtime(at)
+    day = local.date()
+    status = classify_check_in(local, staff.location)
+
+    with transaction.atomic():
+        recorded_status, written = _upsert_check_in(staff, day, status, at)
+        if not written:
+            return recorded_status, False
+        record_check_in(day, status)
+        return status, True
+
+
+def _upsert_check_in(staff, day, status, at):
+    """
+    Insert the check-in, or upgrade an "absent" record for the day, in one
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING statement.
+
+    Any other existing record is left as it is. Returns the record's status
+    as stored and whether this check-in was the one written.
+    """
+    opts = Attendance._meta
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    staff_col, date_col, status_col, timestamp_col = (
+        quote(opts.get_field(name).column) for name in ("staff", "date", "status", "timestamp")
+    )
+    sql = (
+        f"INSERT INTO {table} ({staff_col}, {date_col}, {status_col}, {timestamp_col}) VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT ({staff_col}, {date_col}) DO UPDATE SET "
+        f"{status_col} = CASE WHEN {table}.{status_col} = 'absent' "
+        f"THEN excluded.{status_col} ELSE {table}.{status_col} END, "
+        f"{timestamp_col} = CASE WHEN {table}.{status_col} = 'absent' "
+        f"THEN excluded.{timestamp_col} ELSE {table}.{timestamp_col} END "
+        f"RETURNING {status_col}, {timestamp_col} = %s"
+    )
+    timestamp = connection.ops.adapt_datetimefield_value(at)
+    params = [staff.pk, connection.ops.adapt_datefield_value(day), status, timestamp, timestamp]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        recorded_status, written = cursor.fetchone()
+    return recorded_status, bool(written)
+
+
+# ===================================
+# 🚫 Absentees
+# ===================================
+def absentee_candidates(day, now=None, expected=Q()):
+    """
+    Active staff who had joined by `day` but have neither an attendance
+    record nor approved leave covering it, as (staff_id, date, status,
+    timestamp) rows ready to insert as "absent". `expected` narrows the
+    staff further, e.g. to those whose shift works that day.
+    """
+    end_of_day = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return (
+        User.objects.filter(expected, role="staff", is_active=True, date_joined__lt=end_of_day)
+        .exclude(Exists(Attendance.objects.filter(staff=OuterRef("pk"), date=day)))
+        .exclude(Exists(LeaveDay.objects.filter(staff=OuterRef("pk"), date=day)))
+        .annotate(
+            absent_date=Value(day, output_field=DateField()),
+            absent_status=Value("absent", output_field=CharField()),
+            absent_timestamp=Value(now or timezone.now(), output_field=DateTimeField()),
+        )
+        .order_by()
+        .values_list("pk", "absent_date", "absent_status", "absent_timestamp")
+    )
+
+
+def mark_absentees(start_date, end_date=None, include_weekends=False):
+    """
+    Insert an "absent" record for every active staff member who neither
+    marked attendance nor was on approved leave, for each day in the range.
+
+    Each day is a single INSERT ... SELECT over the staff table, so no
+    rows pass through Python; conflicts on (staff, date) are ignored, which
+    makes re-runs and races with check-ins harmless. Holidays and days
+    outside each staff member's shift weekdays are skipped; with
+    include_weekends only holidays are. The daily rollup is refreshed for
+    the range afterwards. Returns the number of records inserted.
+    """
+    end_date = end_date or start_date
+    opts = Attendance._meta
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(opts.get_field(name).column) for name in ("staff", "date", "status", "timestamp"))
+    insert = connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)
+    suffix = connection.ops.on_conflict_suffix_sql(
+        [opts.get_field("staff"), opts.get_field("date")], OnConflict.IGNORE, None, None
+    )
+
+    inserted = 0
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for day in date_range(start_date, end_date):
+            expected = expected_staff_filter(day, ignore_weekdays=include_weekends)
+            if expected is None:
+                continue
+            try:
+                select, params = absentee_candidates(day, now, expected).query.sql_with_params()
+            except EmptyResultSet:
+                # No shift works that day (e.g. a weekend), so nobody can be absent
+                continue
+            cursor.execute(f"{insert} {quote(opts.db_table)} ({columns}) {select} {suffix}", params)
+            inserted += max(cursor.rowcount, 0)
+
+    refresh_daily_summaries(start_date, end_date)
+    return inserted
+
+
+def reclassify_attendance(start_date, end_date=None):
+    """
+    Re-apply the current shift policies to the present/late records in the
+    range, e.g. after a policy or holiday change, and refresh the rollup.
+
+    Returns the number of records whose status changed.
+    """
+    end_date = end_date or start_date
+    records = Attendance.objects.filter(
+        date__range=(start_date, end_date), status__in=["present", "late"]
+    ).values_list("id", "status", "timestamp", "staff__location")
+
+    changes = {"present": [], "late": []}
+    for record_id, status, timestamp, location in records.iterator(chunk_size=2000):
+        new_status = classify_check_in(timezone.localtime(timestamp), location)
+        if new_status != status:
+            changes[new_status].append(record_id)
+
+    for status, record_ids in changes.items():
+        for i in range(0, len(record_ids), 500):
+            Attendance.objects.filter(id__in=record_ids[i:i + 500]).update(status=status)
+
+    refresh_daily_summaries(start_date, end_date)
+    return len(changes["present"]) + len(changes["late"])
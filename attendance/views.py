@@ -1,15 +1,26 @@
-from datetime import date
-import csv
+from datetime import datetime
+from functools import partial
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import JsonResponse
+from django.utils.timezone import localdate
 
-from .models import Attendance
-
-from datetime import date, datetime, time
-from django.utils.timezone import now
+from accounts.models import User
+from core.concurrency import gather_queries, run_queries
+from core.pagination import keyset_page
+from leave.models import LeaveDay
+from .models import Attendance, DailyAttendanceSummary
+from .aggregates import daily_trend, status_counts as attendance_status_counts
+from .exports import filtered_records
+from .utils import check_in, daily_summaries
+
+# Rows per page of the attendance report table
+REPORT_PAGE_SIZE = 50
+# Seek order for the report table; (staff, date) is unique and covered by its index
+REPORT_ORDERING = ["staff_id", "-date"]
 
 @login_required
 def mark_attendance(request):
@@ -18,53 +29,138 @@ def mark_attendance(request):
         messages.error(request, "Access denied. Staff account required.")
         return redirect("login")
 
-    today = date.today()
-    attendance, created = Attendance.objects.get_or_create(staff=request.user, date=today)
-
     if request.method == "POST":
-        current_time = now().time()
-        cutoff = time(8, 10)  # 8:10 AM
-
-        # Determine status based on current time
-        if current_time <= cutoff:
-            status = "present"
+        status, marked = check_in(request.user)
+        if marked:
+            messages.success(request, f"Your attendance for today has been marked as '{status}'.")
         else:
-            status = "late"
+            messages.info(request, f"Today's attendance already marked as '{status}'.")
+        return redirect("staff_dashboard")
 
-        attendance.status = status
-        attendance.timestamp = now()
-        attendance.save()
+    # Viewing the page never writes; the record is created by the check-in POST
+    today = localdate()
+    attendance = (
+        Attendance.objects.filter(staff=request.user, date=today)
+        .only("status", "timestamp")
+        .first()
+    )
+    already_marked = attendance is not None and attendance.status != "absent"
+
+    return render(request, "attendance/staff_mark.html", {
+        "attendance": attendance,
+        "already_marked": already_marked,
+        "marked_time": attendance.timestamp if already_marked else None,
+        "today_date": today,
+    })
+
+def report_page(params):
+    """One page of report rows (staff joined in) and the cursor for the next page."""
+    records = filtered_records(params).select_related("staff").only(
+        "date", "status", "staff__first_name", "staff__last_name", "staff__email"
+    )
+    return keyset_page(records, REPORT_ORDERING, params.get("after"), REPORT_PAGE_SIZE)
 
-        messages.success(request, f"Your attendance for today has been marked as '{attendance.status}'.")
-        return redirect("staff_dashboard")
 
-    else:
-        if attendance.status:
-            messages.info(request, f"Today's attendance already marked as '{attendance.status}'.")
+def _attendance_report_queries(params):
+    """The report's independent queries, and the context built from their results."""
+    # Filtered queryset
+    records = filtered_records(params)
+    staff_email = params.get("staff", "")
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+
+    # Full date range for the trend chart when both bounds are given
+    range_start = range_end = None
+    if start_date and end_date:
+        range_start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        range_end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    # --- Status distribution & daily trends ---
+    if not staff_email:
+        # All-staff view: read the daily rollup instead of raw attendance rows
+        if range_start and range_end:
+            load_summaries = partial(daily_summaries, range_start, range_end)
         else:
-            messages.info(request, "You haven't marked your attendance yet for today.")
+            summaries = DailyAttendanceSummary.objects.all()
+            if start_date:
+                summaries = summaries.filter(date__gte=start_date)
+            if end_date:
+                summaries = summaries.filter(date__lte=end_date)
+            load_summaries = partial(list, summaries)
+        chart_queries = [load_summaries]
+
+        def charts(summaries):
+            trend_dict = {
+                str(s.date): {"present": s.present, "absent": s.absent, "late": s.late, "on_leave": s.on_leave}
+                for s in summaries
+            }
+            status_counts = {
+                "Present": sum(d["present"] for d in trend_dict.values()),
+                "Absent": sum(d["absent"] for d in trend_dict.values()),
+                "Late": sum(d["late"] for d in trend_dict.values()),
+                "On Leave": sum(d["on_leave"] for d in trend_dict.values()),
+            }
+            return status_counts, trend_dict
+    else:
+        # Days the staff member was on approved leave, from the per-day expansion
+        leave_days = LeaveDay.objects.filter(staff__email=staff_email)
+        if start_date:
+            leave_days = leave_days.filter(date__gte=start_date)
+        if end_date:
+            leave_days = leave_days.filter(date__lte=end_date)
+        chart_queries = [
+            lambda: set(leave_days.values_list("date", flat=True)),
+            partial(attendance_status_counts, records),
+            partial(daily_trend, records, range_start, range_end),
+        ]
 
-    return render(request, "attendance/staff_mark.html", {"attendance": attendance})
+        def charts(on_leave_dates, counts, trend):
+            status_counts = {
+                "Present": counts["present"],
+                "Absent": counts["absent"],
+                "Late": counts["late"],
+                "On Leave": len(on_leave_dates),
+            }
+            # Every day in the range, or only days with records or leave when unbounded
+            for day in on_leave_dates - trend.keys():
+                trend[day] = {"present": 0, "absent": 0, "late": 0}
+            trend_dict = {
+                str(day): {**trend[day], "on_leave": int(day in on_leave_dates)}
+                for day in sorted(trend)
+            }
+            return status_counts, trend_dict
+
+    queries = chart_queries + [
+        # --- Table: first page only; further pages come from attendance_report_rows ---
+        partial(report_page, params),
+        partial(list, User.objects.filter(role="staff")),
+    ]
+
+    def context(*results):
+        *chart_results, (page, next_cursor), staff_list = results
+        status_counts, trend_dict = charts(*chart_results)
+
+        # Prepare final lists for Chart.js
+        trend_labels = list(trend_dict.keys())
+        next_params = params.copy()
+        next_params["after"] = next_cursor or ""
+        return {
+            "attendance_records": page,
+            "next_cursor": next_cursor,
+            "next_query": next_params.urlencode(),
+            "status_labels": list(status_counts.keys()),
+            "status_data": list(status_counts.values()),
+            "trend_labels": trend_labels,
+            "trend_present": [trend_dict[d]["present"] for d in trend_labels],
+            "trend_absent": [trend_dict[d]["absent"] for d in trend_labels],
+            "trend_late": [trend_dict[d]["late"] for d in trend_labels],
+            "trend_on_leave": [trend_dict[d]["on_leave"] for d in trend_labels],
+            "staff_list": staff_list,
+            "selected_staff": staff_email,
+        }
+
+    return queries, context
 
-import csv
-from django.http import HttpResponse
-from django.contrib import messages
-from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, redirect
-from .models import Attendance
-from accounts.models import User
-from django.db import models
-from datetime import timedelta
-import csv
-import openpyxl
-from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
-from django.db import models
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from django.shortcuts import render, redirect
-from accounts.models import User
-from .models import Attendance
 
 @login_required
 def attendance_report(request):
@@ -73,85 +169,42 @@ def attendance_report(request):
         messages.error(request, "Access denied. Admin privileges required.")
         return redirect("login")
 
-    # Base queryset
-    records = Attendance.objects.all().order_by("staff", "-date")
-
-    # Filtering
-    staff_email = request.GET.get("staff", "")
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if staff_email:
-        records = records.filter(staff__email=staff_email)
-    if start_date:
-        records = records.filter(date__gte=start_date)
-    if end_date:
-        records = records.filter(date__lte=end_date)
-
-    # --- Status distribution ---
-    status_counts = {
-        "Present": records.filter(status="present").count(),
-        "Absent": records.filter(status="absent").count(),
-        "Late": records.filter(status="late").count(),
-    }
-    status_labels = list(status_counts.keys())
-    status_data = list(status_counts.values())
-
-    # --- Daily Trends ---
-    # Collect all dates in range (if no records exist, generate a small range)
-    if start_date and end_date:
-        date_list = [
-            start_date + timedelta(days=i)
-            for i in range((datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days + 1)
-        ]
-    else:
-        date_list = sorted({r.date for r in records})  # unique sorted dates from records
-
-    # Create a dict keyed by date for easy lookup
-    trend_dict = {}
-    for d in date_list:
-        trend_dict[str(d)] = {"present": 0, "absent": 0, "late": 0}
-
-    # Fill counts from actual records
-    daily_qs = (
-        records.values("date")
-        .annotate(
-            present=models.Count("id", filter=models.Q(status="present")),
-            absent=models.Count("id", filter=models.Q(status="absent")),
-            late=models.Count("id", filter=models.Q(status="late")),
-        )
-    )
+    queries, context = _attendance_report_queries(request.GET)
+    return render(request, "adminpanel/attendance_reports.html", context(*run_queries(*queries)))
 
-    for item in daily_qs:
-        date_str = str(item["date"])
-        trend_dict[date_str] = {
-            "present": item["present"],
-            "absent": item["absent"],
-            "late": item["late"],
-        }
 
-    # Prepare final lists for Chart.js
-    trend_labels = list(trend_dict.keys())
-    trend_present = [trend_dict[d]["present"] for d in trend_labels]
-    trend_absent = [trend_dict[d]["absent"] for d in trend_labels]
-    trend_late = [trend_dict[d]["late"] for d in trend_labels]
-
-    return render(
-        request,
-        "adminpanel/attendance_reports.html",
-        {
-            "attendance_records": records,
-            "status_labels": status_labels,
-            "status_data": status_data,
-            "trend_labels": trend_labels,
-            "trend_present": trend_present,
-            "trend_absent": trend_absent,
-            "trend_late": trend_late,
-            "staff_list": User.objects.filter(role="staff"),
-            "selected_staff": staff_email,
-        },
-    )
+@login_required
+async def attendance_report_async(request):
+    """attendance_report for ASGI, running its queries concurrently."""
+    user = await request.auser()
+    if not user.is_admin_user():
+        messages.error(request, "Access denied. Admin privileges required.")
+        return redirect("login")
 
+    queries, context = _attendance_report_queries(request.GET)
+    context = context(*await gather_queries(*queries))
+    return await sync_to_async(render)(request, "adminpanel/attendance_reports.html", context)
+
+
+@login_required
+def attendance_report_rows(request):
+    """JSON page of report rows for the table's incremental scrolling."""
+    if not request.user.is_admin_user():
+        return JsonResponse({"error": "Admin privileges required."}, status=403)
+
+    page, next_cursor = report_page(request.GET)
+    return JsonResponse({
+        "rows": [
+            {
+                "staff": record.staff.get_full_name(),
+                "email": record.staff.email,
+                "date": str(record.date),
+                "status": record.status,
+            }
+            for record in page
+        ],
+        "next": next_cursor,
+    })
 
 
 @login_required
@@ -161,60 +214,33 @@ def attendance_export(request, file_type):
         messages.error(request, "Access denied. Admin privileges required.")
         return redirect("login")
 
-    # Base queryset
-    records = Attendance.objects.all().order_by("staff", "-date")
-
-    # Apply same filters
-    staff_email = request.GET.get("staff")
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
+    if file_type not in ("csv", "xlsx"):
+        messages.error(request, "Invalid export type")
+        return redirect("attendance_report")
 
-    if staff_email:
-        records = records.filter(staff__email=staff_email)
-    if start_date:
-        records = records.filter(date__gte=start_date)
-    if end_date:
-        records = records.filter(date__lte=end_date)
+    # Export machinery is only loaded by the export endpoints
+    from core.exports import streaming_csv_response, xlsx_response
+    from core.jobs import request_export, should_run_in_background
+    from . import exports as attendance_exports
+    from .exports import HEADERS as EXPORT_HEADERS, export_rows
+
+    # --- Large exports run in the background ---
+    if should_run_in_background(request, attendance_exports):
+        job, reused = request_export(request.user, "attendance", file_type, request.GET)
+        if reused:
+            messages.info(request, "An identical export is already available below.")
+        else:
+            messages.success(request, "Your export is being prepared. It will be ready to download here shortly.")
+        return redirect("export_jobs")
 
-    # --- CSV Export ---
+    # --- CSV Export (streamed) ---
     if file_type == "csv":
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="attendance_report.csv"'
-        writer = csv.writer(response)
-        writer.writerow(["Staff", "Email", "Date", "Status"])
-        for r in records:
-            writer.writerow([r.staff.get_full_name(), r.staff.email, r.date, r.status])
-        return response
+        return streaming_csv_response("attendance_report.csv", EXPORT_HEADERS, export_rows(request.GET), request=request)
 
     # --- Excel Export ---
-    elif file_type == "xlsx":
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Attendance Report"
-
-        headers = ["Staff", "Email", "Date", "Status"]
-        ws.append(headers)
-
-        for r in records:
-            ws.append([r.staff.get_full_name(), r.staff.email, str(r.date), r.status])
-
-        # Auto adjust column width
-        for col in ws.columns:
-            max_length = 0
-            col_letter = get_column_letter(col[0].column)
-            for cell in col:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            ws.column_dimensions[col_letter].width = max_length + 2
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="attendance_report.xlsx"'
-        wb.save(response)
-        return response
-
     else:
-        messages.error(request, "Invalid export type")
-        return redirect("attendance_report")
+        return xlsx_response(
+            "attendance_report.xlsx", EXPORT_HEADERS, export_rows(request.GET),
+            sheet_title="Attendance Report", request=request,
+        )
 
@@ -0,0 +1,221 @@
+"""
+Dashboard and report latency under concurrent load, served through the
+WSGI handler versus the ASGI handler.
+
+Under ASGI the admin and staff dashboards and the attendance and
+leave reports are async views that run their independent queries
+concurrently; under WSGI they are the sync views (see
+core.concurrency.pick_view). Each server runs in its own process against
+the same freshly seeded file-backed SQLite database:
+
+  wsgi  staff_mgmt.wsgi.application called from a thread pool, one
+        request per thread (like gunicorn --threads); sync views
+  asgi  staff_mgmt.asgi.application called from one event loop, one task
+        per in-flight request (like uvicorn); async views
+
+Requests go straight to the application callables, so the numbers leave
+out the HTTP server itself. Reports p50/p95/p99 latency per page and
+overall, and requests per second.
+
+    python -m benchmarks.asgi_wsgi --staff 200 --days 90 --concurrency 16
+    python -m benchmarks.asgi_wsgi --serial-queries   # ASYNC_PARALLEL_QUERIES off
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.checkin_load import percentile  # noqa: E402
+from benchmarks.sqlite_concurrency import MODES, seed, setup_django  # noqa: E402
+
+# (role, url)
+PAGES = [
+    ("admin", "/adminpanel/dashboard/"),
+    ("admin", "/attendance/report/"),
+    ("admin", "/leave/report/"),
+    ("staff", "/staff/dashboard/"),
+]
+SERVERS = ["wsgi", "asgi"]
+
+
+def requests_to_send(session_keys, count):
+    """`count` (url, session key) pairs cycling through the pages."""
+    return [
+        (PAGES[i % len(PAGES)][1], session_keys[PAGES[i % len(PAGES)][0]])
+        for i in range(count)
+    ]
+
+
+def run_wsgi(requests, concurrency):
+    from wsgiref.util import setup_testing_defaults
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+
+    def call(request):
+        url, session_key = request
+        parts = urlsplit(url)
+        environ = {
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "HTTP_COOKIE": f"{settings.SESSION_COOKIE_NAME}={session_key}",
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        started = time.perf_counter()
+        body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return url, time.perf_counter() - started, int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(call, requests))
+
+
+def run_asgi(requests, concurrency):
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def call(request):
+        url, session_key = request
+        parts = urlsplit(url)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": parts.path,
+            "raw_path": parts.path.encode(),
+            "query_string": parts.query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", f"{settings.SESSION_COOKIE_NAME}={session_key}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        received = asyncio.Event()
+
+        async def receive():
+            if not received.is_set():
+                received.set()
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client never disconnects; Django cancels this once it has responded
+            await asyncio.Future()
+
+        statuses = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        return url, time.perf_counter() - started, statuses[0]
+
+    async def load():
+        pending = iter(requests)
+        results = []
+
+        async def client():
+            for request in pending:
+                results.append(await call(request))
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return results
+
+    return asyncio.run(load())
+
+
+def run_server(server, db_path, mode, session_keys, args):
+    """Warm up, then send the load through one server; returns (url, latency, status) per request."""
+    os.environ["ASYNC_PARALLEL_QUERIES"] = "0" if args.serial_queries else "1"
+    # As staff_mgmt.asgi does, before the URLconf picks its views
+    os.environ["ASYNC_VIEWS"] = "1" if server == "asgi" else "0"
+    setup_django(db_path, mode)
+    run = run_wsgi if server == "wsgi" else run_asgi
+
+    run(requests_to_send(session_keys, len(PAGES) * 2), args.concurrency)
+    started = time.perf_counter()
+    results = run(requests_to_send(session_keys, args.requests), args.concurrency)
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed=None):
+    latencies = [latency * 1000 for _, latency, _ in results]
+    summary = {
+        "requests": len(results),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "errors": sum(status >= 400 for _, _, status in results),
+    }
+    if elapsed:
+        summary["per_second"] = round(len(results) / elapsed, 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staff", type=int, default=200, help="Seeded staff members.")
+    parser.add_argument("--days", type=int, default=90, help="Days of seeded attendance behind the pages.")
+    parser.add_argument("--requests", type=int, default=400, help="Timed requests per server.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once.")
+    parser.add_argument("--mode", choices=list(MODES), default="production", help="SQLite mode (see settings).")
+    parser.add_argument("--serial-queries", action="store_true",
+                        help="Run each view's queries one after another (ASYNC_PARALLEL_QUERIES off).")
+    parser.add_argument("--server", choices=SERVERS, action="append", help="Run only this server (repeatable).")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "asgi_wsgi.sqlite3")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            admin_key, staff_keys = pool.submit(seed, db_path, args.mode, args.staff, args.days).result()
+        session_keys = {"admin": admin_key, "staff": staff_keys[0]}
+
+        for server in args.server or SERVERS:
+            # A fresh process per server, so neither inherits the other's connections or caches
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                server_results, elapsed = pool.submit(
+                    run_server, server, db_path, args.mode, session_keys, args,
+                ).result()
+            results[server] = {
+                "overall": summarize(server_results, elapsed),
+                "pages": {
+                    url: summarize([result for result in server_results if result[0] == url])
+                    for _, url in PAGES
+                },
+            }
+
+    print(json.dumps({
+        "benchmark": "asgi_wsgi",
+        "staff": args.staff,
+        "days": args.days,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mode": args.mode,
+        "parallel_queries": not args.serial_queries,
+        "servers": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Load-test the staff check-in against a file-backed SQLite database.
+
+Simulates the morning peak: every staff member POSTs to the check-in page
+at once from several worker processes (like WSGI workers), each running a
+few threads. Reports latency percentiles and any "database is locked"
+errors, then checks every check-in landed exactly once in the records and
+in the daily rollup.
+
+    python -m benchmarks.checkin_load --staff 500 --workers 8 --threads 4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def setup_django(db_path):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "staff_mgmt.settings")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.EMAIL_OUTBOX_AUTOFLUSH = False
+
+    from django.db import connections
+
+    connections["default"].settings_dict["NAME"] = db_path
+
+
+def seed(db_path, staff_count):
+    """Create the schema and staff accounts, returning one session key per staff member."""
+    setup_django(db_path)
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.management import call_command
+    from django.db import connections
+
+    from accounts.models import User
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+    password = make_password("load-test")
+    User.objects.bulk_create(
+        [User(email=f"load{i}@example.com", password=password, role="staff") for i in range(staff_count)],
+        batch_size=500,
+    )
+
+    session_keys = []
+    for user in User.objects.filter(role="staff").only("id", "password"):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        session_keys.append(session.session_key)
+
+    connections.close_all()
+    return session_keys
+
+
+def run_worker(db_path, session_keys, threads, view_first):
+    """Check in each session once, `threads` at a time; returns per-check-in results."""
+    setup_django(db_path)
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+
+    def check_in(session_key):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        started = time.perf_counter()
+        try:
+            if view_first:
+                client.get("/attendance/mark/")
+            response = client.post("/attendance/mark/")
+            error = None if response.status_code == 302 else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = str(e)
+        finally:
+            connection.close()
+        return time.perf_counter() - started, error
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(check_in, session_keys))
+
+
+def verify(db_path):
+    setup_django(db_path)
+    from django.utils import timezone
+
+    from attendance.models import Attendance, DailyAttendanceSummary
+
+    today = timezone.localdate()
+    summary = DailyAttendanceSummary.objects.filter(date=today).first()
+    return {
+        "records": Attendance.objects.filter(date=today).count(),
+        "rollup_checked_in": (summary.present + summary.late) if summary else 0,
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staff", type=int, default=500, help="Staff members checking in.")
+    parser.add_argument("--workers", type=int, default=8, help="Worker processes.")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent requests per worker.")
+    parser.add_argument("--view-first", action="store_true", help="Load the check-in page before each POST, as a browser does.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "checkin_load.sqlite3")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            session_keys = pool.submit(seed, db_path, args.staff).result()
+
+        slices = [session_keys[i::args.workers] for i in range(args.workers)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_worker, db_path, keys, args.threads, args.view_first) for keys in slices]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - started
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            stored = pool.submit(verify, db_path).result()
+
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = [error for _, error in results if error]
+    print(json.dumps({
+        "benchmark": "checkin_load",
+        "staff": args.staff,
+        "workers": args.workers,
+        "threads": args.threads,
+        "view_first": args.view_first,
+        "seconds": round(elapsed, 2),
+        "check_ins_per_second": round(len(results) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(max(latencies), 1),
+        },
+        "errors": len(errors),
+        "database_locked": sum("database is locked" in error for error in errors),
+        "sample_errors": sorted(set(errors))[:5],
+        **stored,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
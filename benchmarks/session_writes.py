@@ -0,0 +1,87 @@
+"""
+Count SQL reads and writes per page view for a logged-in user, before
+(database sessions saved on every request) and after (cached_db sessions
+with sliding expiry).
+
+    python -m benchmarks.session_writes --views 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.checkin_load import setup_django  # noqa: E402
+
+STAFF_PAGES = ["/staff/dashboard/", "/staff/attendance-history/", "/staff/my-leave-requests/", "/notifications/"]
+
+BEFORE = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+    "SESSION_SAVE_EVERY_REQUEST": True,
+}
+AFTER = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+    "SESSION_SAVE_EVERY_REQUEST": False,
+}
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+def browse(overrides, views):
+    """Log a staff member in, then load staff pages `views` times; returns per-view averages."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    from accounts.models import User
+
+    middleware = list(settings.MIDDLEWARE)
+    if overrides["SESSION_SAVE_EVERY_REQUEST"]:
+        middleware.remove("core.middleware.SlidingSessionMiddleware")
+
+    with override_settings(MIDDLEWARE=middleware, **overrides):
+        client = Client()
+        client.force_login(User.objects.filter(role="staff").first())
+        statements = Counter()
+        for i in range(views):
+            with CaptureQueriesContext(connection) as queries:
+                client.get(STAFF_PAGES[i % len(STAFF_PAGES)])
+            for query in queries:
+                sql = query["sql"].lstrip()
+                verb = sql.split(None, 1)[0].upper()
+                statements["queries"] += 1
+                if verb in WRITES:
+                    statements["writes"] += 1
+                    if "django_session" in sql:
+                        statements["session_writes"] += 1
+                elif "django_session" in sql:
+                    statements["session_reads"] += 1
+
+    return {key: round(statements[key] / views, 2) for key in ("queries", "writes", "session_reads", "session_writes")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", type=int, default=200, help="Page views per configuration.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "session_writes.sqlite3"))
+        from django.core.management import call_command
+
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        call_command("seed_demo_data", staff=20, days=30, json=True, stdout=open(os.devnull, "w"))
+
+        results = {
+            "before": {"settings": BEFORE, "per_view": browse(BEFORE, args.views)},
+            "after": {"settings": AFTER, "per_view": browse(AFTER, args.views)},
+        }
+
+    print(json.dumps({"benchmark": "session_writes", "views": args.views, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Readers vs writers on a file-backed SQLite database, in default and
+production SQLite mode (SQLITE_PRODUCTION_MODE).
+
+Writer processes check every staff member in (POST to the check-in page)
+while reader processes keep loading the admin reports and dashboard, as
+during the morning peak. Reports how long each side waited and how many
+requests failed with "database is locked", per mode.
+
+    python -m benchmarks.sqlite_concurrency --staff 2000 --writers 4 --readers 4
+    python -m benchmarks.sqlite_concurrency --mode production
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import Manager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.checkin_load import percentile  # noqa: E402
+
+MODES = {"default": "0", "production": "1"}
+REPORT_URLS = ["/attendance/report/", "/leave/report/", "/adminpanel/dashboard/", "/attendance/report/rows/"]
+
+
+def setup_django(db_path, mode):
+    # Settings read the mode from the environment, so it must be set before setup
+    os.environ["SQLITE_PRODUCTION_MODE"] = MODES[mode]
+    from benchmarks.checkin_load import setup_django as setup
+
+    setup(db_path)
+
+
+def seed(db_path, mode, staff_count, days):
+    """Seed demo data, clear today's attendance and return (admin session, staff sessions)."""
+    setup_django(db_path, mode)
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.management import call_command
+    from django.db import connections, transaction
+    from django.utils import timezone
+
+    from accounts.models import User
+    from attendance.models import Attendance
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    call_command("seed_demo_data", staff=staff_count, days=days, verbosity=0, json=True, stdout=open(os.devnull, "w"))
+    Attendance.objects.filter(date=timezone.localdate()).delete()
+
+    def session_for(user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    with transaction.atomic():
+        admin_key = session_for(User.objects.filter(role="admin").first())
+        staff_keys = [session_for(user) for user in User.objects.filter(role="staff").only("id", "password")]
+    connections.close_all()
+    return admin_key, staff_keys
+
+
+def timed_get_or_post(client, method, url):
+    started = time.perf_counter()
+    try:
+        response = getattr(client, method)(url)
+        error = None if response.status_code in (200, 302) else f"HTTP {response.status_code}"
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - started, error
+
+
+def run_writers(db_path, mode, session_keys, threads):
+    """Check each staff member in once; returns (latency, error) per check-in."""
+    setup_django(db_path, mode)
+    from django.conf import settings
+    from django.db import close_old_connections
+    from django.test import Client
+
+    def check_in(session_key):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        try:
+            return timed_get_or_post(client, "post", "/attendance/mark/")
+        finally:
+            close_old_connections()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(check_in, session_keys))
+
+
+def run_readers(db_path, mode, session_key, threads, done):
+    """Load the reports until the writers are done; returns (latency, error) per page view."""
+    setup_django(db_path, mode)
+    from django.conf import settings
+    from django.db import close_old_connections
+    from django.test import Client
+
+    def read(offset):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        results, i = [], offset
+        while not done.is_set():
+            results.append(timed_get_or_post(client, "get", REPORT_URLS[i % len(REPORT_URLS)]))
+            close_old_connections()
+            i += 1
+        return results
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return [result for results in pool.map(read, range(threads)) for result in results]
+
+
+def summarize(results, elapsed):
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = [error for _, error in results if error]
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(results),
+        "per_second": round(len(results) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(max(latencies), 1),
+        },
+        "errors": len(errors),
+        "database_locked": sum("database is locked" in error for error in errors),
+        "sample_errors": sorted(set(errors))[:3],
+    }
+
+
+def run_mode(mode, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, f"concurrency_{mode}.sqlite3")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            admin_key, staff_keys = pool.submit(seed, db_path, mode, args.staff, args.days).result()
+
+        with Manager() as manager, ProcessPoolExecutor(max_workers=args.writers + args.readers) as pool:
+            done = manager.Event()
+            started = time.perf_counter()
+            readers = [pool.submit(run_readers, db_path, mode, admin_key, args.threads, done) for _ in range(args.readers)]
+            writers = [
+                pool.submit(run_writers, db_path, mode, staff_keys[i::args.writers], args.threads)
+                for i in range(args.writers)
+            ]
+            write_results = [result for future in writers for result in future.result()]
+            elapsed = time.perf_counter() - started
+            done.set()
+            read_results = [result for future in readers for result in future.result()]
+
+    return {
+        "seconds": round(elapsed, 2),
+        "writers": summarize(write_results, elapsed),
+        "readers": summarize(read_results, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staff", type=int, default=2000, help="Staff members checking in.")
+    parser.add_argument("--days", type=int, default=30, help="Days of seeded attendance behind the reports.")
+    parser.add_argument("--writers", type=int, default=4, help="Processes checking staff in.")
+    parser.add_argument("--readers", type=int, default=4, help="Processes loading reports.")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent requests per process.")
+    parser.add_argument("--mode", choices=list(MODES), action="append", help="Run only this mode (repeatable).")
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "benchmark": "sqlite_concurrency",
+        "staff": args.staff,
+        "days": args.days,
+        "writers": args.writers,
+        "readers": args.readers,
+        "threads": args.threads,
+        "modes": {mode: run_mode(mode, args) for mode in (args.mode or list(MODES))},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
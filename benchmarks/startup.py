@@ -0,0 +1,95 @@
+"""
+Benchmark worker cold start: django.setup(), loading the URLconf and the
+first request(s), each run in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --url / --url /accounts/login/
+
+The project database is swapped for an empty in-memory one, so only pages
+that do not query the database (e.g. anonymous ones) are meaningful here.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+
+def measure(urls):
+    """One cold start in this (fresh) process; returns timings in milliseconds."""
+    import time
+
+    started = time.perf_counter()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "staff_mgmt.settings")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    setup_done = time.perf_counter()
+
+    from importlib import import_module
+
+    import_module(settings.ROOT_URLCONF)
+    urls_done = time.perf_counter()
+
+    from django.db import connections
+    from django.test import Client
+
+    settings.ALLOWED_HOSTS = ["*"]
+    connections["default"].settings_dict["NAME"] = ":memory:"
+    client = Client()
+
+    result = {
+        "setup_ms": (setup_done - started) * 1000,
+        "urlconf_ms": (urls_done - setup_done) * 1000,
+    }
+    for url in urls:
+        for attempt in ("first", "second"):
+            request_started = time.perf_counter()
+            response = client.get(url)
+            result[f"{attempt} {url}"] = (time.perf_counter() - request_started) * 1000
+            result[f"status {url}"] = response.status_code
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run_once(urls):
+    """Measure in a fresh interpreter, so no module is already imported."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", *sum((["--url", url] for url in urls), [])],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", action="append", default=None, help="Page requested after boot (repeatable).")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    urls = args.url or ["/", "/accounts/login/"]
+
+    if args.child:
+        print(json.dumps(measure(urls)))
+        return
+
+    run_once(urls)  # warm the bytecode cache
+    runs = [run_once(urls) for _ in range(args.runs)]
+
+    summary = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs]
+        if key.startswith("status "):
+            summary[key] = sorted(set(values))
+        else:
+            summary[key] = {"median": round(statistics.median(values), 1), "min": round(min(values), 1)}
+    print(json.dumps({"benchmark": "startup", "runs": args.runs, "results": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Repeatable benchmark of the hot paths against a freshly seeded database.
+
+Seeds N staff x D days with `manage.py seed_demo_data` into a temporary
+file-backed SQLite database, then times:
+
+  endpoints   the real views through the Django test client, per role
+  exports     the attendance/leave export iterators, CSV and XLSX writers
+  aggregates  the report, dashboard and rollup queries
+
+Results are printed (or written with --output) as JSON; pass --compare with
+an earlier result file to see the change per measurement, e.g. before and
+after a commit:
+
+    python -m benchmarks.suite --staff 200 --days 365 --output before.json
+    git checkout my-branch
+    python -m benchmarks.suite --staff 200 --days 365 --compare before.json
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+# (name, role, url name, url args, query string)
+ENDPOINTS = [
+    ("admin_dashboard", "admin", "admin_dashboard", [], ""),
+    ("manage_staff", "admin", "manage_staff", [], ""),
+    ("leave_requests", "admin", "leave_requests", [], ""),
+    ("attendance_report", "admin", "attendance_report", [], ""),
+    ("attendance_report_rows", "admin", "attendance_report_rows", [], ""),
+    ("attendance_export_csv", "admin", "attendance_export", ["csv"], ""),
+    ("leave_report", "admin", "leave_report", [], ""),
+    ("leave_report_rows", "admin", "leave_report_rows", [], ""),
+    ("leave_export_xlsx", "admin", "leave_export", ["xlsx"], ""),
+    ("notifications_list", "admin", "notifications_list", [], ""),
+    ("staff_dashboard", "staff", "staff_dashboard", [], ""),
+    ("attendance_history", "staff", "attendance_history", [], ""),
+    ("my_leave_requests", "staff", "my_leave_requests", [], ""),
+    ("mark_attendance", "staff", "mark_attendance", [], ""),
+    ("apply_leave", "staff", "apply_leave", [], ""),
+]
+
+
+def setup_django(db_path):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "staff_mgmt.settings")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.EMAIL_OUTBOX_AUTOFLUSH = False
+    # Time the exports in the request rather than queueing them
+    settings.EXPORT_BACKGROUND_THRESHOLD = 0
+
+    from django.db import connections
+
+    connections["default"].settings_dict["NAME"] = db_path
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeat):
+    """Run func once to warm up, then `repeat` times; returns timings in ms and the query count."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    func()
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "queries": len(queries),
+    }
+
+
+def bench_endpoints(repeat, cold):
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    from accounts.models import User
+
+    clients = {}
+    for role in ("admin", "staff"):
+        clients[role] = Client()
+        clients[role].force_login(User.objects.filter(role=role).order_by("id").first())
+
+    results = {}
+    for name, role, url_name, args, query in ENDPOINTS:
+        url = reverse(url_name, args=args) + query
+        client = clients[role]
+
+        def request():
+            if cold:
+                cache.clear()
+            response = client.get(url)
+            if response.status_code >= 400:
+                raise RuntimeError(f"GET {url} as {role} returned {response.status_code}")
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+
+        results[name] = measure(request, repeat)
+    return results
+
+
+def bench_exports(repeat):
+    import tempfile as tmp
+
+    from attendance import exports as attendance_exports
+    from core.exports import SPOOL_MAX_SIZE, iter_csv, write_xlsx
+    from leave import exports as leave_exports
+
+    def consume(rows):
+        for _ in rows:
+            pass
+
+    def csv(source):
+        for _ in iter_csv(source.HEADERS, source.export_rows({})):
+            pass
+
+    def xlsx(source):
+        with tmp.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+            write_xlsx(output, source.HEADERS, source.export_rows({}), sheet_title=source.SHEET_TITLE)
+
+    results = {}
+    for kind, source in (("attendance", attendance_exports), ("leave", leave_exports)):
+        results[f"{kind}_rows"] = {**measure(lambda: consume(source.export_rows({})), repeat),
+                                   "rows": source.row_count({})}
+        results[f"{kind}_csv"] = measure(lambda: csv(source), repeat)
+        results[f"{kind}_xlsx"] = measure(lambda: xlsx(source), repeat)
+    return results
+
+
+def bench_aggregates(repeat):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from attendance import aggregates as attendance_aggregates
+    from attendance.models import Attendance
+    from attendance.utils import approved_leave_days, daily_summaries, refresh_daily_summaries
+    from leave import aggregates as leave_aggregates
+    from leave.models import Leave
+
+    today = timezone.localdate()
+    year_ago = today - timedelta(days=364)
+    month_ago = today - timedelta(days=29)
+    cases = {
+        "attendance_status_counts": lambda: attendance_aggregates.status_counts(Attendance.objects.all()),
+        "attendance_summary": lambda: attendance_aggregates.attendance_summary(Attendance.objects.all(), today),
+        "attendance_daily_trend_90d": lambda: attendance_aggregates.daily_trend(
+            Attendance.objects.all(), today - timedelta(days=89), today),
+        "leave_status_counts": lambda: leave_aggregates.status_counts(Leave.objects.all()),
+        "leave_daily_status_trend": lambda: leave_aggregates.daily_status_trend(Leave.objects.all()),
+        "approved_leave_days_365d": lambda: approved_leave_days(year_ago, today),
+        "daily_summaries_365d": lambda: daily_summaries(year_ago, today),
+        "refresh_daily_summaries_30d": lambda: refresh_daily_summaries(month_ago, today),
+    }
+    return {name: measure(case, repeat) for name, case in cases.items()}
+
+
+def compare(current, baseline):
+    """Median change per measurement, in percent (negative is faster)."""
+    changes = {}
+    for group, results in current["results"].items():
+        for name, result in results.items():
+            before = baseline.get("results", {}).get(group, {}).get(name)
+            if not before or not before.get("median_ms"):
+                continue
+            changes[f"{group}.{name}"] = {
+                "before_ms": before["median_ms"],
+                "after_ms": result["median_ms"],
+                "change_pct": round((result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100, 1),
+                "queries": [before.get("queries"), result["queries"]],
+            }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--leaves-per-staff", type=int, default=10)
+    parser.add_argument("--notifications-per-user", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement (after one warm-up).")
+    parser.add_argument("--cold-cache", action="store_true", help="Clear the cache before every request.")
+    parser.add_argument("--only", choices=["endpoints", "exports", "aggregates"], action="append",
+                        help="Run only these groups (repeatable).")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against.")
+    args = parser.parse_args()
+    groups = args.only or ["endpoints", "exports", "aggregates"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "benchmark.sqlite3"))
+        from django.core.management import call_command
+
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        seeded = io.StringIO()
+        call_command(
+            "seed_demo_data", staff=args.staff, days=args.days, leaves_per_staff=args.leaves_per_staff,
+            notifications_per_user=args.notifications_per_user, seed=args.seed, json=True, stdout=seeded,
+        )
+
+        results = {}
+        if "endpoints" in groups:
+            results["endpoints"] = bench_endpoints(args.repeat, args.cold_cache)
+        if "exports" in groups:
+            results["exports"] = bench_exports(args.repeat)
+        if "aggregates" in groups:
+            results["aggregates"] = bench_aggregates(args.repeat)
+
+        from django.db import connections
+
+        connections.close_all()
+
+    output = {
+        "benchmark": "suite",
+        "commit": git_commit(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "seed": json.loads(seeded.getvalue()),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as baseline:
+            output["comparison"] = compare(output, json.load(baseline))
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as destination:
+            destination.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark the XLSX export engine against the previous in-memory workbook path.
+
+Each run happens in a fresh process so peak memory is measured per variant.
+
+    python -m benchmarks.xlsx_export --rows 100000 1000000
+    python -m benchmarks.xlsx_export --rows 1000000 --skip-legacy-above 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADERS = ["Staff", "Email", "Date", "Status"]
+STATUSES = ["present", "late", "absent"]
+
+
+def synthetic_rows(count):
+    """Attendance-shaped rows, generated lazily like the export iterators."""
+    start = date(2024, 1, 1)
+    for i in range(count):
+        staff = i % 500
+        yield [f"Staff Member {staff}", f"staff{staff}@example.com", start + timedelta(days=i // 500), STATUSES[i % 3]]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_legacy(row_count):
+    """The previous path: full Workbook in memory, widths from every cell."""
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+
+    started = time.perf_counter()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Attendance Report"
+    ws.append(HEADERS)
+    for row in synthetic_rows(row_count):
+        ws.append(row)
+    for col in ws.columns:
+        max_length = 0
+        col_letter = get_column_letter(col[0].column)
+        for cell in col:
+            if cell.value:
+                max_length = max(max_length, len(str(cell.value)))
+        ws.column_dimensions[col_letter].width = max_length + 2
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        size = output.tell()
+    return {"variant": "legacy", "rows": row_count, "seconds": round(time.perf_counter() - started, 2),
+            "peak_rss_mb": peak_rss_mb(), "bytes": size}
+
+
+def run_engine(row_count):
+    """core.exports.write_xlsx into a spooled temp file, as served by the views."""
+    from core.exports import SPOOL_MAX_SIZE, write_xlsx
+
+    started = time.perf_counter()
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+        write_xlsx(output, HEADERS, synthetic_rows(row_count), sheet_title="Attendance Report")
+        size = output.tell()
+    return {"variant": "write_only", "rows": row_count, "seconds": round(time.perf_counter() - started, 2),
+            "peak_rss_mb": peak_rss_mb(), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=None,
+                        help="Skip the legacy path for row counts above this (it needs several GB at 1M rows).")
+    args = parser.parse_args()
+
+    results = []
+    for row_count in args.rows:
+        variants = [run_engine]
+        if args.skip_legacy_above is None or row_count <= args.skip_legacy_above:
+            variants.insert(0, run_legacy)
+        for variant in variants:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(variant, row_count).result()
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+
+    print(json.dumps({"benchmark": "xlsx_export", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# core/concurrency.py
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+
+def _in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+
+
+def run_queries(*calls):
+    """gather_queries() for sync views: the calls one after another on this connection."""
+    return [call() for call in calls]
+
+
+def _run_on_own_connection(call):
+    try:
+        return call()
+    finally:
+        # Worker threads keep their own connections; close them like a request would
+        close_old_connections()
+
+
+async def gather_queries(*calls):
+    """
+    Run independent, read-only ORM calls at the same time; returns their
+    results in order.
+
+    Each call is a zero-argument callable that finishes its queries before
+    returning (e.g. `queryset.count`, or a lambda wrapping `list(...)`).
+    They run in worker threads on separate connections, so the database
+    serves them in parallel (SQLite in WAL mode allows concurrent readers).
+    Inside a transaction, which other connections cannot see into, or with
+    ASYNC_PARALLEL_QUERIES off, they run one after another on the request's
+    own connection instead.
+    """
+    if (
+        len(calls) < 2
+        or not getattr(settings, "ASYNC_PARALLEL_QUERIES", True)
+        or await sync_to_async(_in_transaction)()
+    ):
+        return await sync_to_async(run_queries)(*calls)
+    return await asyncio.gather(
+        *(sync_to_async(_run_on_own_connection, thread_sensitive=False)(call) for call in calls)
+    )
+
+
+def pick_view(sync_view, async_view):
+    """
+    The view to route a URL to: async_view when ASYNC_VIEWS is on (the
+    ASGI entry point turns it on), sync_view otherwise.
+
+    Under WSGI an async view costs an event loop and several thread hops
+    per request, so WSGI deployments keep the sync views.
+    """
+    return async_view if getattr(settings, "ASYNC_VIEWS", False) else sync_view
@@ -0,0 +1,121 @@
+# core/exports.py
+import csv
+import io
+import tempfile
+from itertools import chain, islice
+
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+
+# Rows fetched per database round trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+# Rows written into each chunk sent to the client
+ROWS_PER_CHUNK = 500
+# Rows inspected to size XLSX columns
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 60
+# XLSX output stays in memory up to this size, then spills to disk
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_csv(headers, rows, rows_per_chunk=ROWS_PER_CHUNK):
+    """Yield CSV text in chunks of rows_per_chunk rows, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(headers)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder
+
+
+async def _aiter_chunks(chunks):
+    """Pull each chunk of a sync iterator in the request's sync thread, where its cursor lives."""
+    chunks = iter(chunks)
+    done = object()
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def stream_for(request, response):
+    """
+    Make a streaming response stream under ASGI as well as WSGI.
+
+    Under ASGI, Django reads a sync iterator into a list before sending
+    any of it, so the whole export would be held in memory. ASGI requests
+    get an async iterator instead, which sends each chunk as it is made.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+
+    if isinstance(request, ASGIRequest) and not response.is_async:
+        response.streaming_content = _aiter_chunks(response.streaming_content)
+    return response
+
+
+def streaming_csv_response(filename, headers, rows, request=None):
+    """Stream rows to the client as a CSV attachment without buffering the file."""
+    response = StreamingHttpResponse(iter_csv(headers, rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return stream_for(request, response)
+
+
+def column_widths(headers, sample_rows):
+    """Column widths fitted to the headers and a sample of rows."""
+    widths = [len(str(header)) for header in headers]
+    for row in sample_rows:
+        for index, value in enumerate(row):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+    return [min(width, MAX_COLUMN_WIDTH) + 2 for width in widths]
+
+
+def write_xlsx(fileobj, headers, rows, sheet_title="Sheet", sample_size=WIDTH_SAMPLE_ROWS):
+    """
+    Write rows to fileobj as an XLSX workbook in openpyxl write-only mode.
+
+    Cells are streamed to disk as they are appended instead of being kept
+    in memory, so column widths are fixed up front from the first
+    sample_size rows. Returns the number of data rows written.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    for index, width in enumerate(column_widths(headers, sample), 1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+
+    sheet.append(headers)
+    count = 0
+    for row in chain(sample, rows):
+        sheet.append(row)
+        count += 1
+
+    workbook.save(fileobj)
+    return count
+
+
+def xlsx_response(filename, headers, rows, sheet_title="Sheet", request=None):
+    """Build the workbook in a spooled temp file and serve it as an attachment."""
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    write_xlsx(output, headers, rows, sheet_title=sheet_title)
+    output.seek(0)
+    response = FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+    return stream_for(request, response)
@@ -0,0 +1,146 @@
+# core/jobs.py
+import io
+import logging
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .exports import iter_csv, write_xlsx
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+# Modules providing HEADERS, FILENAME, SHEET_TITLE, FILTER_FIELDS, row_count() and export_rows()
+EXPORT_SOURCES = {
+    "attendance": "attendance.exports",
+    "leave": "leave.exports",
+}
+
+# Progress is written back to the job every this many rows
+PROGRESS_EVERY = 5000
+
+
+def get_export_source(kind):
+    return import_module(EXPORT_SOURCES[kind])
+
+
+def export_filters(source, params):
+    """Keep only the non-empty filters the export source understands."""
+    return {field: params.get(field) for field in source.FILTER_FIELDS if params.get(field)}
+
+
+def should_run_in_background(request, source):
+    """Explicit ?background=1, or more rows than EXPORT_BACKGROUND_THRESHOLD."""
+    if request.GET.get("background") == "1":
+        return True
+    threshold = getattr(settings, "EXPORT_BACKGROUND_THRESHOLD", None)
+    return bool(threshold) and source.row_count(request.GET) > threshold
+
+
+# ===================================
+# 📦 Job lifecycle
+# ===================================
+def request_export(user, kind, file_type, params):
+    """
+    Queue an export, reusing an identical one when possible.
+
+    A job the same user requested with the same filters is reused while
+    it is still queued or running, or when it finished within
+    EXPORT_JOB_TTL_MINUTES; jobs are only listed and served to the admin
+    who requested them. Returns (job, reused).
+    """
+    filters = export_filters(get_export_source(kind), params)
+    filters_hash = ExportJob.make_hash(kind, file_type, filters)
+
+    ttl = timedelta(minutes=getattr(settings, "EXPORT_JOB_TTL_MINUTES", 30))
+    identical = ExportJob.objects.filter(requested_by=user, filters_hash=filters_hash)
+    existing = (
+        identical.filter(status__in=["pending", "running"]).first()
+        or identical.filter(status="done", finished_at__gte=timezone.now() - ttl).first()
+    )
+    if existing:
+        return existing, True
+
+    job = ExportJob.objects.create(
+        requested_by=user,
+        kind=kind,
+        file_type=file_type,
+        filters=filters,
+        filters_hash=filters_hash,
+    )
+    return job, False
+
+
+def claim_next_job():
+    """Atomically move the oldest pending job to running; None when the queue is empty."""
+    while True:
+        job_id = (
+            ExportJob.objects.filter(status="pending")
+            .order_by("created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = ExportJob.objects.filter(id=job_id, status="pending").update(
+            status="running", started_at=timezone.now()
+        )
+        if claimed:
+            return ExportJob.objects.get(id=job_id)
+        # Another worker took it first; try the next one
+
+
+def requeue_stale_jobs(minutes):
+    """Return jobs stuck in running (e.g. after a worker crash) to the queue."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return ExportJob.objects.filter(status="running", started_at__lt=cutoff).update(
+        status="pending", rows_written=0
+    )
+
+
+def _track_progress(job, rows):
+    """Pass rows through, recording how many have been written."""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            ExportJob.objects.filter(id=job.id).update(rows_written=count)
+    job.rows_written = count
+
+
+def run_export_job(job):
+    """Generate the job's file under MEDIA_ROOT/exports/ and mark it done (or failed)."""
+    try:
+        source = get_export_source(job.kind)
+        job.rows_total = source.row_count(job.filters)
+        ExportJob.objects.filter(id=job.id).update(rows_total=job.rows_total)
+
+        rows = _track_progress(job, source.export_rows(job.filters))
+        filename = f"{source.FILENAME}_{job.id}.{job.file_type}"
+
+        with tempfile.TemporaryFile() as output:
+            if job.file_type == "csv":
+                text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+                for chunk in iter_csv(source.HEADERS, rows):
+                    text.write(chunk)
+                text.flush()
+                text.detach()
+            else:
+                write_xlsx(output, source.HEADERS, rows, sheet_title=source.SHEET_TITLE)
+            output.seek(0)
+            job.file.save(filename, File(output), save=False)
+
+        job.status = "done"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["file", "status", "rows_written", "finished_at"])
+    except Exception as e:
+        logger.exception(f"Export job {job.id} failed: {e}")
+        job.status = "failed"
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
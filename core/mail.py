@@ -0,0 +1,164 @@
+# core/mail.py
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Defaults for deliver_outbox(), overridable per call and by the worker options
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_BACKOFF_SECONDS = 60
+
+# Drains the outbox after a commit when EMAIL_OUTBOX_AUTOFLUSH is on
+_flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-outbox")
+
+
+# ===================================
+# 📨 Queueing
+# ===================================
+def queue_email(subject, body, to, html_body="", from_email=None):
+    """Store one email in the outbox; it is sent by the worker, never in the request."""
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or "",
+        to=list(to),
+    )
+    _schedule_flush()
+    return email
+
+
+def queue_emails(emails):
+    """
+    Store many emails in the outbox with a single bulk insert.
+
+    emails: iterable of dicts with subject, body, to and optional html_body / from_email.
+    """
+    queued = OutboundEmail.objects.bulk_create(
+        [
+            OutboundEmail(
+                subject=email["subject"],
+                body=email["body"],
+                html_body=email.get("html_body", ""),
+                from_email=email.get("from_email") or "",
+                to=list(email["to"]),
+            )
+            for email in emails
+        ],
+        batch_size=500,
+    )
+    if queued:
+        _schedule_flush()
+    return queued
+
+
+def _schedule_flush():
+    """Without a running worker (e.g. development), drain the outbox on a background thread."""
+    if getattr(settings, "EMAIL_OUTBOX_AUTOFLUSH", False):
+        transaction.on_commit(lambda: _flush_executor.submit(_flush_outbox))
+
+
+def _flush_outbox():
+    try:
+        while deliver_outbox()["claimed"]:
+            pass
+    except Exception as e:
+        logger.exception(f"Background outbox flush failed: {e}")
+    finally:
+        db_connection.close()
+
+
+# ===================================
+# 🚚 Delivery
+# ===================================
+def claim_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """Mark up to batch_size due emails as sending and return them."""
+    due_ids = list(
+        OutboundEmail.objects.filter(status="pending", next_attempt_at__lte=timezone.now())
+        .order_by("next_attempt_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+
+    claim = uuid.uuid4()
+    # Only rows still pending are taken, so concurrent workers never share an email
+    # next_attempt_at doubles as the claim time while an email is sending
+    OutboundEmail.objects.filter(id__in=due_ids, status="pending").update(
+        status="sending", claimed_by=claim, next_attempt_at=timezone.now()
+    )
+    return list(OutboundEmail.objects.filter(claimed_by=claim, status="sending"))
+
+
+def deliver_outbox(batch_size=OUTBOX_BATCH_SIZE, max_attempts=OUTBOX_MAX_ATTEMPTS, backoff_seconds=OUTBOX_BACKOFF_SECONDS):
+    """
+    Send one batch of due emails over a single reused SMTP connection.
+
+    Failed emails are retried with exponential backoff
+    (backoff_seconds * 2 ** (attempts - 1)) and dead-lettered after
+    max_attempts. Returns counts of claimed, sent, retried and dead emails.
+    """
+    emails = claim_batch(batch_size)
+    result = {"claimed": len(emails), "sent": 0, "retried": 0, "dead": 0}
+    if not emails:
+        return result
+
+    sent_ids = []
+    failures = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                connection.send_messages([email.to_message(connection)])
+                sent_ids.append(email.id)
+            except Exception as e:
+                failures.append((email, e))
+    except Exception as e:
+        # Could not connect at all: the whole batch is retried
+        failures = [(email, e) for email in emails if email.id not in sent_ids]
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    now = timezone.now()
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(status="sent", sent_at=now, claimed_by=None, last_error="")
+        result["sent"] = len(sent_ids)
+
+    for email, error in failures:
+        email.attempts += 1
+        email.last_error = str(error)
+        email.claimed_by = None
+        if email.attempts >= max_attempts:
+            email.status = "dead"
+            result["dead"] += 1
+            logger.error(f"Giving up on email {email.id} to {email.to} after {email.attempts} attempts: {error}")
+        else:
+            email.status = "pending"
+            email.next_attempt_at = now + timedelta(seconds=backoff_seconds * 2 ** (email.attempts - 1))
+            result["retried"] += 1
+            logger.warning(f"Email {email.id} to {email.to} failed (attempt {email.attempts}): {error}")
+        email.save(update_fields=["attempts", "last_error", "claimed_by", "status", "next_attempt_at"])
+
+    return result
+
+
+def release_stale_claims(minutes=15):
+    """Return emails stuck in sending (e.g. after a worker crash) to the queue."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return OutboundEmail.objects.filter(status="sending", next_attempt_at__lt=cutoff).update(
+        status="pending", claimed_by=None
+    )
@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from django_session in small batches (a gentler clearsessions)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Sessions deleted per statement.")
+        parser.add_argument("--sleep", type=float, default=0.05,
+                            help="Seconds to pause between batches so other writers get the lock.")
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now).order_by("expire_date")
+
+        deleted = 0
+        while True:
+            # Each batch is its own short transaction, found through the expire_date index
+            keys = list(expired.values_list("session_key", flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired session(s)."))
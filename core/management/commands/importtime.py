@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before it can serve its first request
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "from importlib import import_module; from django.conf import settings; "
+    "import_module(settings.ROOT_URLCONF)"
+)
+
+# "import time:       self |  cumulative | <indent>package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` stderr into {module: (self_us, cumulative_us, depth)}.
+
+    Depth 0 is a module imported directly by the boot script.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def project_packages():
+    """Top-level packages that belong to this project rather than to site-packages."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    packages = {settings.SETTINGS_MODULE.split(".")[0]}
+    for app_config in apps.get_app_configs():
+        if base_dir in Path(app_config.path).resolve().parents:
+            packages.add(app_config.name.split(".")[0])
+    return packages
+
+
+class Command(BaseCommand):
+    help = "Report per-module import cost of booting the project (django.setup() plus the URLconf)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Number of modules to list.")
+        parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative",
+                            help="Rank modules by cumulative time (with their imports) or self time.")
+        parser.add_argument("--project-only", action="store_true", help="Only list this project's modules.")
+        parser.add_argument("--runs", type=int, default=3,
+                            help="Boot this many fresh interpreters and keep each module's fastest time.")
+        parser.add_argument("--import", dest="extra", action="append", default=[], metavar="MODULE",
+                            help="Also import MODULE after booting (repeatable), e.g. core.exports.")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
+
+    def boot(self, script):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Booting the project failed:\n{result.stderr[-2000:]}")
+        return parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT + "".join(f"; import_module({module!r})" for module in options["extra"])
+
+        # The first boot also warms the bytecode cache, so it is not counted
+        self.boot(script)
+        best = {}
+        for _ in range(max(options["runs"], 1)):
+            for name, (self_us, cumulative_us, depth) in self.boot(script).items():
+                if name not in best or cumulative_us < best[name][1]:
+                    best[name] = (self_us, cumulative_us, depth)
+
+        total_us = sum(cumulative for _, cumulative, depth in best.values() if depth == 0)
+        project = project_packages()
+        project_self_us = sum(self_us for name, (self_us, _, _) in best.items() if name.split(".")[0] in project)
+        rows = [
+            {"module": name, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000,
+             "project": name.split(".")[0] in project}
+            for name, (self_us, cumulative_us, _) in best.items()
+        ]
+        if options["project_only"]:
+            rows = [row for row in rows if row["project"]]
+        rows.sort(key=lambda row: row[f"{options['sort']}_ms"], reverse=True)
+        rows = rows[:options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps({
+                "total_ms": round(total_us / 1000, 1),
+                "modules": len(best),
+                "project_self_ms": round(project_self_us / 1000, 1),
+                "top": rows,
+            }, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Imported {len(best)} modules in {total_us / 1000:.1f} ms (fastest of {options['runs']} runs); "
+            f"{project_self_us / 1000:.1f} ms in this project's own modules"
+        ))
+        if sys.flags.dont_write_bytecode or os.environ.get("PYTHONDONTWRITEBYTECODE"):
+            self.stdout.write(self.style.WARNING(
+                "Bytecode caching is disabled, so times include compiling every module."
+            ))
+        self.stdout.write(f"{'cumulative':>11} {'self':>9}  module")
+        for row in rows:
+            line = f"{row['cumulative_ms']:>9.1f}ms {row['self_ms']:>7.1f}ms  {row['module']}"
+            self.stdout.write(self.style.SUCCESS(line) if row["project"] else line)
@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.jobs import claim_next_job, requeue_stale_jobs, run_export_job
+
+
+def process_job(job):
+    """Run one job on a pool thread, which keeps its own DB connection."""
+    try:
+        run_export_job(job)
+    finally:
+        connection.close()
+    return job
+
+
+class Command(BaseCommand):
+    help = "Run queued report exports (ExportJob) on a local thread pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Number of exports generated in parallel.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained.")
+        parser.add_argument("--stale-minutes", type=int, default=60,
+                            help="Requeue running jobs started more than this many minutes ago.")
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+        requeued = requeue_stale_jobs(options["stale_minutes"])
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale export job(s)."))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Export worker started ({workers} workers)."))
+        running = set()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    while len(running) < workers:
+                        job = claim_next_job()
+                        if job is None:
+                            break
+                        self.stdout.write(f"Started export job {job.id} ({job.kind}, {job.file_type}).")
+                        running.add(pool.submit(process_job, job))
+
+                    if not running:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+                        continue
+
+                    done, running = wait(running, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = future.result()
+                        style = self.style.SUCCESS if job.status == "done" else self.style.ERROR
+                        self.stdout.write(style(f"Export job {job.id} finished: {job.status}."))
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING("Stopping export worker..."))
@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.utils import refresh_daily_summaries
+from core.factories import (
+    DEFAULT_PASSWORD, make_admin, make_attendance, make_leaves, make_notifications, make_staff,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate N staff x D days of attendance, leave requests and notifications with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--staff", type=int, default=200, help="Staff accounts to create.")
+        parser.add_argument("--days", type=int, default=365, help="Days of attendance, ending today (weekdays only).")
+        parser.add_argument("--leaves-per-staff", type=int, default=10)
+        parser.add_argument("--notifications-per-user", type=int, default=15)
+        parser.add_argument("--prefix", default="demo", help="Staff emails are <prefix><n>@example.com.")
+        parser.add_argument("--admin-email", default="admin@example.com",
+                            help=f"Admin sending the notifications; created with password {DEFAULT_PASSWORD!r} if missing.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, for repeatable data.")
+        parser.add_argument("--replace", action="store_true",
+                            help="Delete staff from a previous run with the same --prefix first.")
+        parser.add_argument("--json", action="store_true", help="Print row counts and timings as JSON.")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        existing = User.objects.filter(role="staff", email__startswith=prefix)
+        if existing.exists():
+            if not options["replace"]:
+                raise CommandError(f'Staff with the "{prefix}" prefix already exist; use --replace or another --prefix.')
+            existing.delete()
+
+        rng = random.Random(options["seed"])
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=options["days"] - 1)
+        timings, counts = {}, {}
+
+        def timed(step, func, *args, **kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings[step] = round(time.perf_counter() - started, 2)
+            return result
+
+        with transaction.atomic():
+            admin = User.objects.filter(email=options["admin_email"]).first()
+            admin = admin or make_admin(email=options["admin_email"])
+            staff = timed("staff", make_staff, options["staff"], prefix=prefix, rng=rng)
+            counts["staff"] = len(staff)
+            counts["attendance"] = timed("attendance", make_attendance, staff, start_date, end_date, rng=rng)
+            counts["leaves"] = timed(
+                "leaves", make_leaves, staff, options["leaves_per_staff"],
+                start_date, end_date + timedelta(days=30), rng=rng,
+            )
+            counts["notifications"] = timed(
+                "notifications", make_notifications, staff + [admin], options["notifications_per_user"],
+                sender=admin, rng=rng,
+            )
+            timed("daily_summaries", refresh_daily_summaries, start_date, end_date)
+
+        if options["json"]:
+            self.stdout.write(json.dumps({
+                "start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+                "rows": counts, "seconds": timings, "total_seconds": round(sum(timings.values()), 2),
+            }, indent=2))
+            return
+
+        for step, seconds in timings.items():
+            rows = f"{counts[step]} rows" if step in counts else "rebuilt"
+            self.stdout.write(f"{step:<16} {rows:>14}  {seconds:>7.2f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(staff)} staff from {start_date} to {end_date} in {sum(timings.values()):.1f}s. "
+            f"Staff log in as {prefix}0@example.com ... with password {DEFAULT_PASSWORD!r}."
+        ))
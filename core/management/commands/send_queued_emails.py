@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mail import (
+    OUTBOX_BACKOFF_SECONDS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    deliver_outbox,
+    release_stale_claims,
+)
+from core.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = "Send emails from the outbox (OutboundEmail) in batches over one SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE, help="Emails sent per connection.")
+        parser.add_argument("--max-attempts", type=int, default=OUTBOX_MAX_ATTEMPTS,
+                            help="Attempts before an email is dead-lettered.")
+        parser.add_argument("--backoff", type=int, default=OUTBOX_BACKOFF_SECONDS,
+                            help="Base retry delay in seconds (doubles after each failure).")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to wait when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once no emails are due.")
+        parser.add_argument("--retry-dead", action="store_true", help="Requeue dead-lettered emails before starting.")
+
+    def handle(self, *args, **options):
+        if options["retry_dead"]:
+            revived = OutboundEmail.objects.filter(status="dead").update(status="pending", attempts=0)
+            self.stdout.write(self.style.WARNING(f"Requeued {revived} dead-lettered email(s)."))
+
+        released = release_stale_claims()
+        if released:
+            self.stdout.write(self.style.WARNING(f"Released {released} email(s) stuck in sending."))
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Email outbox worker started."))
+        try:
+            while True:
+                close_old_connections()
+                result = deliver_outbox(
+                    batch_size=options["batch_size"],
+                    max_attempts=options["max_attempts"],
+                    backoff_seconds=options["backoff"],
+                )
+                if result["claimed"]:
+                    self.stdout.write(
+                        f"Sent {result['sent']}, retrying {result['retried']}, dead-lettered {result['dead']}."
+                    )
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Stopping email outbox worker..."))
@@ -0,0 +1,52 @@
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.metrics import endpoint_stats, reset
+
+SORT_KEYS = ["p95_ms", "p50_ms", "max_ms", "avg_queries", "max_queries", "avg_db_ms", "avg_template_ms", "requests"]
+
+
+class Command(BaseCommand):
+    help = "List the slowest endpoints recorded by RequestMetricsMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20, help="Number of endpoints to list.")
+        parser.add_argument("--sort", choices=SORT_KEYS, default="p95_ms", help="Column to rank endpoints by.")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
+        parser.add_argument("--reset", action="store_true", help="Clear the recorded stats afterwards.")
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            self.stderr.write(self.style.WARNING("REQUEST_METRICS_ENABLED is off, so no new requests are recorded."))
+        alias = getattr(settings, "REQUEST_METRICS_CACHE_ALIAS", "default")
+        if isinstance(caches[alias], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                f'Cache "{alias}" is local memory, so requests served by other processes are not visible here. '
+                "Point REQUEST_METRICS_CACHE_ALIAS at a shared cache (file-based, Redis, Memcached)."
+            ))
+
+        rows = sorted(endpoint_stats(), key=lambda row: row[options["sort"]], reverse=True)[:options["top"]]
+        if options["reset"]:
+            reset()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        if not rows:
+            self.stdout.write("No requests recorded yet.")
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'endpoint':<36} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+            f"{'queries':>8} {'max q':>6} {'db ms':>8} {'tpl ms':>8} {'5xx':>4}"
+        ))
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint'][:36]:<36} {row['requests']:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['max_ms']:>8.1f} {row['avg_queries']:>8.1f} {row['max_queries']:>6} "
+                f"{row['avg_db_ms']:>8.1f} {row['avg_template_ms']:>8.1f} {row['errors']:>4}"
+            )
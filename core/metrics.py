@@ -0,0 +1,190 @@
+# core/metrics.py
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+# Samples kept per endpoint in the rolling table
+METRICS_WINDOW = 200
+# Seconds between merging this process's samples into the shared table
+METRICS_FLUSH_SECONDS = 5
+METRICS_CACHE_KEY = "core:request_metrics"
+
+# Metrics of the request being handled on this thread/task
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Timings gathered while handling one request; durations in seconds.
+
+    Queries may run on several threads at once (gather_queries), so db_time
+    is the sum over all of them and can exceed the wall time.
+    """
+    queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    template_depth: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook counting every query and its duration."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.db_time += elapsed
+                self.queries += 1
+
+
+# ===================================
+# 🗃️ Query timing
+# ===================================
+def _time_query(execute, sql, params, many, context):
+    """Execute wrapper on every connection: counts the query for the request being measured, if any."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.query_wrapper(execute, sql, params, many, context)
+
+
+def install_query_timing(connection=None, **kwargs):
+    """
+    Time queries on `connection`, or on this thread's open connections (idempotent).
+
+    Also a connection_created receiver, so connections opened later on any
+    thread are covered: sync_to_async threads and gather_queries workers
+    see the request's metrics through the copied context.
+    """
+    for conn in [connection] if connection is not None else connections.all(initialized_only=True):
+        if _time_query not in conn.execute_wrappers:
+            conn.execute_wrappers.append(_time_query)
+
+
+# ===================================
+# ⏱️ Template timing
+# ===================================
+_template_timing_installed = False
+
+
+def install_template_timing():
+    """Time every Django template render in the request being measured (idempotent)."""
+    global _template_timing_installed
+    if _template_timing_installed:
+        return
+    from django.template.backends.django import Template
+
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return render(self, context, request)
+        # Only the outermost render counts; nested ones are part of its time
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - started
+
+    Template.render = timed_render
+    _template_timing_installed = True
+
+
+# ===================================
+# 📊 Rolling stats table
+# ===================================
+_pending = defaultdict(list)
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, "REQUEST_METRICS_CACHE_ALIAS", "default")]
+
+
+def record(endpoint, wall_time, metrics, status_code):
+    """Add one request to this process's samples, merging them into the shared table now and then."""
+    global _last_flush
+    sample = (
+        round(wall_time * 1000, 2), metrics.queries, round(metrics.db_time * 1000, 2),
+        round(metrics.template_time * 1000, 2), status_code,
+    )
+    with _lock:
+        _pending[endpoint].append(sample)
+        interval = getattr(settings, "REQUEST_METRICS_FLUSH_SECONDS", METRICS_FLUSH_SECONDS)
+        if time.monotonic() - _last_flush < interval:
+            return
+        _last_flush = time.monotonic()
+        pending = dict(_pending)
+        _pending.clear()
+    flush(pending)
+
+
+def flush(pending=None):
+    """
+    Merge samples into the table shared through the cache.
+
+    Concurrent flushes from several processes may drop a few samples; the
+    table is for spotting slow endpoints, not for accounting.
+    """
+    if pending is None:
+        with _lock:
+            pending = dict(_pending)
+            _pending.clear()
+    if not pending:
+        return
+    window = getattr(settings, "REQUEST_METRICS_WINDOW", METRICS_WINDOW)
+    table = _cache().get(METRICS_CACHE_KEY) or {}
+    for endpoint, samples in pending.items():
+        rolling = deque(table.get(endpoint, ()), maxlen=window)
+        rolling.extend(samples)
+        table[endpoint] = list(rolling)
+    _cache().set(METRICS_CACHE_KEY, table, None)
+
+
+def reset():
+    with _lock:
+        _pending.clear()
+    _cache().delete(METRICS_CACHE_KEY)
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def endpoint_stats():
+    """Per-endpoint summary of the rolling table, slowest (p95 wall time) first."""
+    flush()
+    stats = []
+    for endpoint, samples in (_cache().get(METRICS_CACHE_KEY) or {}).items():
+        if not samples:
+            continue
+        walls = sorted(sample[0] for sample in samples)
+        queries = [sample[1] for sample in samples]
+        count = len(samples)
+        stats.append({
+            "endpoint": endpoint,
+            "requests": count,
+            "p50_ms": _percentile(walls, 50),
+            "p95_ms": _percentile(walls, 95),
+            "max_ms": walls[-1],
+            "avg_queries": round(sum(queries) / count, 1),
+            "max_queries": max(queries),
+            "avg_db_ms": round(sum(sample[2] for sample in samples) / count, 2),
+            "avg_template_ms": round(sum(sample[3] for sample in samples) / count, 2),
+            "errors": sum(sample[4] >= 500 for sample in samples),
+        })
+    stats.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return stats
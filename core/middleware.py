@@ -0,0 +1,107 @@
+# core/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import RequestMetrics, current_metrics, install_query_timing, install_template_timing, record
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-request SQL query count, DB time, template render time and wall time.
+
+    Enabled by REQUEST_METRICS_ENABLED; list it first in MIDDLEWARE so the
+    wall time covers the rest of the stack. The timings are sent back in a
+    Server-Timing header (visible in the browser's network panel) and
+    collected per URL name for `manage.py slowest_endpoints`. Streaming
+    responses are timed until the view returns, not until the last byte.
+    Runs as sync or async middleware to match the handler, and counts
+    queries on every thread serving the request (see install_query_timing).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Under ASGI stay async, so async views are not pushed through a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_template_timing()
+        install_query_timing()
+        connection_created.connect(install_query_timing)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # Connections this thread opened before the middleware was loaded
+        install_query_timing()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - started)
+
+    def finish(self, request, response, metrics, wall_time):
+        match = getattr(request, "resolver_match", None)
+        endpoint = match.view_name if match else "<unresolved>"
+        # Only touches the cache every REQUEST_METRICS_FLUSH_SECONDS, so async requests call it directly
+        record(endpoint, wall_time, metrics, response.status_code)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f"tpl;dur={metrics.template_time * 1000:.1f}",
+            f"total;dur={wall_time * 1000:.1f}",
+        ])
+        return response
+
+
+class SlidingSessionMiddleware(MiddlewareMixin):
+    """
+    Keep active sessions alive without writing the session on every request.
+
+    Replaces SESSION_SAVE_EVERY_REQUEST: an unchanged session is only saved
+    again, pushing its expiry back a full SESSION_COOKIE_AGE, once less than
+    SESSION_REFRESH_THRESHOLD seconds of it remain. Must come after
+    SessionMiddleware so the save happens on the way out.
+    """
+    REFRESHED_KEY = "_session_refreshed_at"
+
+    def process_response(self, request, response):
+        session = getattr(request, "session", None)
+        # No session cookie, or the session was just flushed (logout)
+        if session is None or session.is_empty():
+            return response
+
+        refreshed_at = session.get(self.REFRESHED_KEY)
+        # The cookie pointed at a session that no longer exists
+        if session.is_empty():
+            return response
+
+        now = int(time.time())
+        threshold = getattr(settings, "SESSION_REFRESH_THRESHOLD", 0)
+        remaining = session.get_expiry_age() - (now - (refreshed_at or 0))
+        if session.modified or remaining < threshold:
+            # Free when the session is being saved anyway
+            session[self.REFRESHED_KEY] = now
+        return response
@@ -1,3 +1,109 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
+from django.utils import timezone
+
+
+class ExportJob(models.Model):
+    """A report export generated in the background by the run_export_jobs worker."""
+
+    KIND_CHOICES = (
+        ("attendance", "Attendance Report"),
+        ("leave", "Leave Report"),
+    )
+
+    FILE_TYPES = (
+        ("csv", "CSV"),
+        ("xlsx", "Excel"),
+    )
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    file_type = models.CharField(max_length=10, choices=FILE_TYPES)
+    filters = models.JSONField(default=dict, blank=True)
+    filters_hash = models.CharField(max_length=64, db_index=True)  # Identifies identical exports for reuse
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/", blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @staticmethod
+    def make_hash(kind, file_type, filters):
+        """Stable hash of an export request, independent of filter order."""
+        payload = json.dumps([kind, file_type, filters], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def progress(self):
+        """Completion percentage (0-100)."""
+        if self.status == "done":
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(int(self.rows_written * 100 / self.rows_total), 99)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.file_type}) - {self.status}"
+
+
+class OutboundEmail(models.Model):
+    """An email waiting in the outbox for the send_queued_emails worker."""
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("dead", "Dead"),  # Gave up after too many failed attempts
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.UUIDField(null=True, blank=True)  # Batch currently sending this email
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            # Worker polling for due emails
+            models.Index(fields=["status", "next_attempt_at"], name="outbound_email_due_idx"),
+        ]
+
+    def to_message(self, connection=None):
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email or settings.DEFAULT_FROM_EMAIL,
+            to=self.to,
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, "text/html")
+        return message
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
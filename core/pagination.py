@@ -0,0 +1,93 @@
+# core/pagination.py
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for the ordering values of the last row on a page."""
+    payload = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Ordering values from a cursor, or None when it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _cursor_values(model, ordering, values):
+    """
+    The cursor's values converted to each ordering field's Python type, or
+    None when the cursor does not fit the ordering.
+
+    Cursors come back from clients, so a value of the wrong type ("abc" for
+    an id, a bad date) means the cursor is treated as missing rather than
+    failing the query.
+    """
+    if len(values) != len(ordering):
+        return None
+    try:
+        return [
+            model._meta.get_field(field.lstrip("-")).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (TypeError, ValueError, ValidationError):
+        return None
+
+
+def _after(ordering, values):
+    """Filter for rows strictly after `values` in the given ordering."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+
+    # Redundant bound on the leading column so the database can seek the index
+    # instead of evaluating the OR for every row
+    first, first_value = ordering[0], values[0]
+    lookup = "lte" if first.startswith("-") else "gte"
+    return Q(**{f"{first.lstrip('-')}__{lookup}": first_value}) & condition
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=50):
+    """
+    One page of queryset using keyset (seek) pagination.
+
+    `ordering` lists the fields to order by (prefix "-" for descending) and
+    must identify rows uniquely, e.g. ["staff_id", "-date"]. Each page is a
+    single indexed range query however deep the client has scrolled,
+    unlike OFFSET pagination. Ordering fields must be the model's own
+    fields. A malformed cursor returns the first page. Returns
+    (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor)
+    if values:
+        values = _cursor_values(queryset.model, ordering, values)
+    if values:
+        queryset = queryset.filter(_after(ordering, values))
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    fields = [field.lstrip("-") for field in ordering]
+    if isinstance(last, dict):
+        last_values = [last[field] for field in fields]
+    else:
+        last_values = [getattr(last, field) for field in fields]
+    return rows, encode_cursor(last_values)
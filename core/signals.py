@@ -0,0 +1,15 @@
+# core/signals.py
+import time
+
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .middleware import SlidingSessionMiddleware
+
+
+@receiver(user_logged_in)
+def stamp_session_refresh(sender, request, user, **kwargs):
+    """A fresh login starts the sliding-expiry clock, so the next request need not save the session."""
+    session = getattr(request, "session", None)
+    if session is not None:
+        session[SlidingSessionMiddleware.REFRESHED_KEY] = int(time.time())
@@ -0,0 +1,79 @@
+# core/testing.py
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from attendance.policies import invalidate_policies
+
+from .factories import make_attendance, make_leaves, make_notifications, make_staff, seed
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Seeds an organisation at realistic volume once per class and checks
+    how many SQL queries each page runs.
+
+    Budgets are fixed numbers, so a page that starts querying per row
+    (an N+1) blows its budget at these volumes; assertQueriesDoNotGrow()
+    additionally checks that a page's query count ignores the data volume.
+    Caches are cleared before each request, so budgets are for cold caches.
+    """
+    STAFF_COUNT = 200
+    DAYS = 365
+    LEAVES_PER_STAFF = 10
+    NOTIFICATIONS_PER_USER = 15
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(
+            staff_count=cls.STAFF_COUNT,
+            days=cls.DAYS,
+            leaves_per_staff=cls.LEAVES_PER_STAFF,
+            notifications_per_user=cls.NOTIFICATIONS_PER_USER,
+        )
+        cls.admin = cls.data.admin
+        cls.member = cls.data.staff[0]
+
+    def request(self, user, url, method="get", data=None):
+        """Request `url` as `user` (None for anonymous); returns (response, captured queries)."""
+        self.client.logout()
+        if user is not None:
+            self.client.force_login(user)
+        cache.clear()
+        invalidate_policies()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {})
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        return response, queries
+
+    def assertQueryBudget(self, budget, user, url, method="get", data=None):
+        response, queries = self.request(user, url, method, data)
+        self.assertLess(response.status_code, 500)
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{method.upper()} {url} ran {len(queries)} queries (budget {budget}):\n"
+            + "\n".join(query["sql"] for query in queries),
+        )
+        return response
+
+    def assertBudgets(self, user, budgets):
+        """Check every {url: budget} for one user, reporting each page separately."""
+        for url, budget in budgets.items():
+            with self.subTest(url=url, user=user and user.role):
+                self.assertQueryBudget(budget, user, url)
+
+    def assertQueriesDoNotGrow(self, user, url):
+        """The page runs the same number of queries after more staff, attendance, leave and notifications."""
+        _, before = self.request(user, url)
+        extra = make_staff(20, prefix="extra")
+        make_attendance(extra, self.data.start_date, self.data.end_date)
+        make_leaves(extra + [self.member], 5, self.data.start_date, self.data.end_date)
+        make_notifications(extra + [self.admin, self.member], 10, sender=self.admin)
+        _, after = self.request(user, url)
+        self.assertEqual(
+            len(before), len(after),
+            f"{url} went from {len(before)} to {len(after)} queries as data grew:\n"
+            + "\n".join(query["sql"] for query in after),
+        )
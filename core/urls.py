@@ -3,5 +3,8 @@ from . import views
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("exports/", views.export_jobs, name="export_jobs"),
+    path("exports/<int:job_id>/status/", views.export_job_status, name="export_job_status"),
+    path("exports/<int:job_id>/download/", views.export_job_download, name="export_job_download"),
  
 ]
@@ -1,7 +1,53 @@
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+
+from .models import ExportJob
  
 def home(request):
     return render(request, "core/home.html")
 
 
+@login_required
+def export_jobs(request):
+    """Admins can follow their background exports and download finished files."""
+    if not request.user.is_admin_user():
+        messages.error(request, "Access denied. Admin privileges required.")
+        return redirect("login")
+
+    jobs = ExportJob.objects.filter(requested_by=request.user)[:20]
+    return render(request, "core/export_jobs.html", {"jobs": jobs})
+
+
+@login_required
+def export_job_status(request, job_id):
+    """JSON progress for a single export job (polled by the export jobs page)."""
+    if not request.user.is_admin_user():
+        return JsonResponse({"error": "Admin privileges required."}, status=403)
+
+    job = get_object_or_404(ExportJob, id=job_id, requested_by=request.user)
+    return JsonResponse({
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "rows_written": job.rows_written,
+        "rows_total": job.rows_total,
+        "error": job.error,
+    })
+
+
+@login_required
+def export_job_download(request, job_id):
+    """Serve a finished export file to the admin who requested it."""
+    if not request.user.is_admin_user():
+        messages.error(request, "Access denied. Admin privileges required.")
+        return redirect("login")
+
+    job = get_object_or_404(ExportJob, id=job_id, requested_by=request.user, status="done")
+    if not job.file:
+        raise Http404("Export file is no longer available.")
+    from .exports import stream_for
+
+    response = FileResponse(job.file.open("rb"), as_attachment=True, filename=job.file.name.rsplit("/", 1)[-1])
+    return stream_for(request, response)
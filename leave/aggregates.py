@@ -0,0 +1,35 @@
+# leave/aggregates.py
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+from .models import Leave
+
+STATUSES = [status for status, _ in Leave.STATUS_CHOICES]
+
+
+def status_counts(queryset):
+    """
+    Count every leave status for the queryset in a single query.
+
+    Returns a dict such as {"total": 5, "pending": 2, "approved": 2, "rejected": 1}.
+    """
+    return queryset.order_by().aggregate(
+        total=Count("id"),
+        **{status: Count("id", filter=Q(status=status)) for status in STATUSES},
+    )
+
+
+def daily_status_trend(queryset):
+    """
+    Per-day status counts by application date from one GROUP BY query.
+
+    Returns a dict keyed by date, in date order, of
+    {"pending": n, "approved": n, "rejected": n}; only days with requests appear.
+    """
+    rows = (
+        queryset.annotate(day=TruncDate("applied_at"))
+        .order_by("day")
+        .values("day")
+        .annotate(**{status: Count("id", filter=Q(status=status)) for status in STATUSES})
+    )
+    return {row["day"]: {status: row[status] for status in STATUSES} for row in rows}
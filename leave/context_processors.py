@@ -1,19 +1,23 @@
 # leave/context_processors.py
-from .models import Notification
+from django.utils.functional import SimpleLazyObject
+
+from .utils import get_notification_summary
+
 
 def notifications_context(request):
-    if request.user.is_authenticated:
-        # Full queryset first
-        notifications_qs = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-        
-        # Count unread before slicing
-        unread_count = notifications_qs.filter(is_read=False).count()
-        
-        # Slice only for recent notifications
-        notifications = notifications_qs[:10]
-        
-        return {
-            "notifications_list": notifications,
-            "unread_notifications_count": unread_count
-        }
-    return {}
+    """
+    Notification bell data for every template.
+
+    Both values are lazy: the (cached) lookup only runs when a template
+    actually renders the bell, so pages without it never touch the cache
+    or the database.
+    """
+    def summary():
+        if not request.user.is_authenticated:
+            return {"unread_count": 0, "recent": []}
+        return get_notification_summary(request.user)
+
+    return {
+        "notifications_list": SimpleLazyObject(lambda: summary()["recent"]),
+        "unread_notifications_count": SimpleLazyObject(lambda: summary()["unread_count"]),
+    }
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from leave.utils import rebuild_leave_days
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day expansion of approved leaves (LeaveDay) from scratch"
+
+    def handle(self, *args, **options):
+        total = rebuild_leave_days()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} leave days."))
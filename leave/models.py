@@ -23,16 +23,45 @@ class Leave(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     applied_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin leave queues: pending/approved lists ordered by newest first
+            models.Index(fields=["status", "-applied_at"], name="leave_status_applied_idx"),
+            # Per-staff status counts (staff dashboard, my leave requests)
+            models.Index(fields=["staff", "status"], name="leave_staff_status_idx"),
+            # Leave report pages, keyset-paginated by staff then newest first
+            models.Index(fields=["staff", "-applied_at", "-id"], name="leave_staff_applied_idx"),
+        ]
+
     def __str__(self):
         return f"{self.staff.username} - {self.leave_type} ({self.start_date} to {self.end_date}) - {self.status}"
 
 
+class LeaveDay(models.Model):
+    """One row per day covered by an approved leave, so "who is on leave on X" is an index lookup."""
+
+    leave = models.ForeignKey(Leave, on_delete=models.CASCADE, related_name="days")
+    staff = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leave_days")
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("leave", "date")
+        indexes = [
+            # Staff on leave for a day or range (rollup, absentee job, dashboard, reports)
+            models.Index(fields=["date", "staff"], name="leaveday_date_staff_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.staff_id} on leave {self.date}"
+
+
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 class Notification(models.Model):
-    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    # Not separately indexed: both composite indexes below lead with recipient
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications", db_index=False)
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="sent_notifications")
     subject = models.CharField(max_length=255)
     message = models.TextField()
@@ -41,6 +70,16 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unread badge count and unread lists (partial: unread rows only)
+            models.Index(
+                fields=["recipient", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
+            # Recent notifications per user
+            models.Index(fields=["recipient", "-created_at"], name="notification_recent_idx"),
+        ]
 
     def __str__(self):
         return f"Notification to {self.recipient.email} - {self.subject}"
\ No newline at end of file
@@ -0,0 +1,13 @@
+# leave/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .utils import invalidate_notification_cache
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    """Created, read or deleted notifications invalidate the recipient's cached bell."""
+    invalidate_notification_cache(instance.recipient_id)
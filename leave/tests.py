@@ -1,3 +1,133 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.factories import make_admin, make_staff
+from core.testing import QueryBudgetTestCase
+
+from .models import Leave, Notification
+from .utils import get_notification_summary, send_leave_notification
+
+
+class LeaveQueryBudgetTests(QueryBudgetTestCase):
+    def reports(self):
+        return [
+            reverse("leave_report"),
+            reverse("leave_report_rows"),
+            reverse("leave_export", args=["csv"]),
+            reverse("leave_export", args=["xlsx"]),
+        ]
+
+    def notification_pages(self, user):
+        notification = Notification.objects.filter(recipient=user).first()
+        return [
+            reverse("notifications_list"),
+            reverse("notifications_mark_read", args=[notification.id]),
+            reverse("notifications_mark_all"),
+        ]
+
+    def test_admin(self):
+        report, rows, csv_export, xlsx_export = self.reports()
+        notifications, mark_read, mark_all = self.notification_pages(self.admin)
+        self.assertBudgets(self.admin, {
+            reverse("apply_leave"): 2,
+            report: 7,
+            f"{report}?status=approved": 7,
+            rows: 3,
+            csv_export: 4,
+            xlsx_export: 4,
+            notifications: 6,
+            mark_read: 4,
+            mark_all: 3,
+        })
+
+    def test_staff(self):
+        notifications, mark_read, mark_all = self.notification_pages(self.member)
+        budgets = {url: 2 for url in self.reports()}
+        budgets.update({
+            reverse("apply_leave"): 4,
+            notifications: 6,
+            mark_read: 4,
+            mark_all: 3,
+        })
+        self.assertBudgets(self.member, budgets)
+
+    def test_anonymous_is_turned_away(self):
+        urls = [reverse("apply_leave"), *self.reports(), *self.notification_pages(self.member)]
+        self.assertBudgets(None, {url: 0 for url in urls})
+
+    def test_apply_leave(self):
+        data = {
+            "leave_type": "casual",
+            "start_date": self.data.end_date.isoformat(),
+            "end_date": self.data.end_date.isoformat(),
+            "reason": "Family event",
+        }
+        before = Leave.objects.filter(staff=self.member).count()
+        self.assertQueryBudget(8, self.member, reverse("apply_leave"), method="post", data=data)
+        self.assertEqual(Leave.objects.filter(staff=self.member).count(), before + 1)
+
+    def test_queries_do_not_grow_with_data(self):
+        for user, url in [
+            (self.admin, reverse("leave_report")),
+            (self.admin, reverse("leave_report_rows")),
+            (self.member, reverse("notifications_list")),
+        ]:
+            with self.subTest(url=url):
+                self.assertQueriesDoNotGrow(user, url)
+
+
+class NotificationBellTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_admin()
+        cls.member, cls.other = make_staff(2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.member)
+
+    def unread(self, user):
+        return get_notification_summary(user)["unread_count"]
+
+    def notify(self, user, subject="Leave Request Approved"):
+        return Notification.objects.create(sender=self.admin, recipient=user, subject=subject, message="Approved.")
+
+    def test_bell_is_cached(self):
+        self.notify(self.member)
+        self.assertEqual(self.unread(self.member), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(self.member), 1)
+
+    def test_creating_a_notification_invalidates_the_bell(self):
+        self.assertEqual(self.unread(self.member), 0)
+        notification = self.notify(self.member)
+        summary = get_notification_summary(self.member)
+        self.assertEqual(summary["unread_count"], 1)
+        self.assertEqual(summary["recent"], [notification])
+
+    def test_bulk_created_notifications_invalidate_every_recipient(self):
+        self.assertEqual((self.unread(self.member), self.unread(self.other)), (0, 0))
+        send_leave_notification(self.admin, [self.member, self.other], "Office closed", "Closed on Friday.")
+        self.assertEqual((self.unread(self.member), self.unread(self.other)), (1, 1))
+
+    def test_reading_a_notification_invalidates_the_bell(self):
+        first, second = self.notify(self.member), self.notify(self.member)
+        self.assertEqual(self.unread(self.member), 2)
+
+        self.client.get(reverse("notifications_mark_read", args=[first.id]))
+        self.assertEqual(self.unread(self.member), 1)
+
+        # Marking all read is one UPDATE, without post_save signals
+        self.client.get(reverse("notifications_mark_all"))
+        self.assertEqual(self.unread(self.member), 0)
+
+        second.delete()
+        self.assertEqual(get_notification_summary(self.member)["recent"], [first])
+
+    def test_other_users_bells_are_untouched(self):
+        self.notify(self.other)
+        self.assertEqual(self.unread(self.other), 1)
+        self.notify(self.member)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(self.other), 1)
@@ -1,12 +1,14 @@
 # leave/urls.py
 from django.urls import path
+from core.concurrency import pick_view
 from . import views
 
 # app_name = "leave"
 
 urlpatterns = [
     path("apply/", views.apply_leave, name="apply_leave"),
-    path("report/", views.leave_report, name="leave_report"),
+    path("report/", pick_view(views.leave_report, views.leave_report_async), name="leave_report"),
+    path("report/rows/", views.leave_report_rows, name="leave_report_rows"),
     path("report/export/<str:export_format>/", views.leave_export, name="leave_export"),
 
 ]
\ No newline at end of file
@@ -1,17 +1,30 @@
 # leave/utils.py
 import logging
-from django.core.mail import send_mail, BadHeaderError
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models, IntegrityError
+from django.core.cache import caches
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
-from .models import Notification
+from core.mail import queue_email
+from .models import Leave, LeaveDay, Notification
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Notifications inserted per INSERT statement
+NOTIFICATION_BATCH_SIZE = 500
+# Leave days inserted per INSERT statement
+LEAVE_DAY_BATCH_SIZE = 1000
+
 def send_leave_notification(sender, recipient, subject, message, request=None):
     """
-    Sends an email and creates an on-site notification safely.
+    Creates on-site notifications in bulk and queues the email in the outbox.
+
+    Notifications for all recipients are inserted with bulk_create in
+    batches inside one transaction; the email is stored in the outbox and
+    delivered by the send_queued_emails worker, so the caller returns
+    without waiting on SMTP.
 
     Args:
         sender (User): The user who triggered the notification.
@@ -21,44 +34,116 @@ def send_leave_notification(sender, recipient, subject, message, request=None):
         request (HttpRequest, optional): Only used for internal logging; no flash messages shown.
     """
     # Ensure recipient is a list
-    if not isinstance(recipient, (list, tuple, models.QuerySet)):
+    if isinstance(recipient, models.QuerySet):
+        recipient = recipient.only("id", "email")
+    elif not isinstance(recipient, (list, tuple)):
         recipient = [recipient]
 
+    recipients = []
     for user in recipient:
         if not isinstance(user, User):
             logger.warning(f"Invalid recipient type: {type(user)}")
             continue
+        recipients.append(user)
 
-        # Save notification in DB
-        try:
-            Notification.objects.create(
-                sender=sender,
-                recipient=user,
-                subject=subject,
-                message=message
+    # Save notifications in DB
+    try:
+        with transaction.atomic():
+            Notification.objects.bulk_create(
+                [
+                    Notification(sender=sender, recipient=user, subject=subject, message=message)
+                    for user in recipients
+                ],
+                batch_size=NOTIFICATION_BATCH_SIZE,
             )
-        except IntegrityError as e:
-            logger.error(f"Failed to create notification for {user}: {e}")
-            continue
-        except Exception as e:
-            logger.exception(f"Unexpected error creating notification for {user}: {e}")
-            continue
+    except Exception as e:
+        logger.exception(f"Failed to create notifications for {len(recipients)} recipient(s): {e}")
+    else:
+        # bulk_create sends no post_save signals
+        invalidate_notification_cache(*[user.pk for user in recipients])
 
-    # Send email
-    emails = [user.email for user in recipient if getattr(user, "email", None)]
+    # Queue email
+    emails = [user.email for user in recipients if getattr(user, "email", None)]
     if emails:
         try:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
-                recipient_list=emails,
-                fail_silently=False,
-            )
-        except BadHeaderError as e:
-            logger.error(f"Bad header in email: {e}")
+            queue_email(subject=subject, body=message, to=emails)
         except Exception as e:
-            logger.exception(f"Failed to send email to {emails}: {e}")
+            logger.exception(f"Failed to queue email to {emails}: {e}")
 
     # Remove on-site flash messages to keep UI professional
     # Notifications are still saved and emails sent silently
+
+
+# ===================================
+# 🔔 Cached notification summary
+# ===================================
+RECENT_NOTIFICATIONS = 10
+
+
+def _notifications_cache():
+    return caches[getattr(settings, "NOTIFICATIONS_CACHE_ALIAS", "default")]
+
+
+def notifications_cache_key(user_id):
+    return f"notifications:summary:{user_id}"
+
+
+def get_notification_summary(user):
+    """
+    Unread count and most recent notifications for a user, cached per user.
+
+    The entry is dropped by invalidate_notification_cache() whenever the
+    user's notifications are created, read or deleted.
+    """
+    cache = _notifications_cache()
+    key = notifications_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        notifications = Notification.objects.filter(recipient=user)
+        summary = {
+            "unread_count": notifications.filter(is_read=False).count(),
+            "recent": list(notifications.order_by("-created_at")[:RECENT_NOTIFICATIONS]),
+        }
+        cache.set(key, summary, getattr(settings, "NOTIFICATIONS_CACHE_TIMEOUT", 300))
+    return summary
+
+
+def invalidate_notification_cache(*user_ids):
+    """Drop the cached notification summary for the given users."""
+    _notifications_cache().delete_many([notifications_cache_key(user_id) for user_id in user_ids])
+
+
+# ===================================
+# 📅 Leave days
+# ===================================
+def _leave_days(leave):
+    return [
+        LeaveDay(leave_id=leave.id, staff_id=leave.staff_id, date=leave.start_date + timedelta(days=i))
+        for i in range((leave.end_date - leave.start_date).days + 1)
+    ]
+
+
+def sync_leave_days(leave):
+    """Expand an approved leave into LeaveDay rows, or remove them when it is not approved."""
+    with transaction.atomic():
+        LeaveDay.objects.filter(leave_id=leave.id).delete()
+        if leave.status == "approved":
+            LeaveDay.objects.bulk_create(_leave_days(leave), batch_size=LEAVE_DAY_BATCH_SIZE)
+
+
+def rebuild_leave_days():
+    """Recreate every LeaveDay row from the approved leaves; returns the number of rows."""
+    approved = Leave.objects.filter(status="approved").only("id", "staff_id", "start_date", "end_date")
+    total = 0
+    with transaction.atomic():
+        LeaveDay.objects.all().delete()
+        batch = []
+        for leave in approved.iterator(chunk_size=2000):
+            batch.extend(_leave_days(leave))
+            if len(batch) >= LEAVE_DAY_BATCH_SIZE:
+                LeaveDay.objects.bulk_create(batch, batch_size=LEAVE_DAY_BATCH_SIZE)
+                total += len(batch)
+                batch = []
+        LeaveDay.objects.bulk_create(batch, batch_size=LEAVE_DAY_BATCH_SIZE)
+        total += len(batch)
+    return total
@@ -1,4 +1,4 @@
-import csv
+import json
 
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
@@ -29,17 +29,16 @@ def apply_leave(request):
             try:
                 # Notify all admins
                 admins = User.objects.filter(role="admin")
-                if admins.exists():
-                    send_leave_notification(
-                        sender=request.user,
-                        recipient=admins,
-                        subject="New Leave Request Submitted",
-                        message=(
-                            f"{request.user.get_full_name()} submitted a new leave request "
-                            f"({leave.leave_type}) from {leave.start_date} to {leave.end_date}."
-                        ),
-                        request=request  # optional on-site notification
-                    )
+                send_leave_notification(
+                    sender=request.user,
+                    recipient=admins,
+                    subject="New Leave Request Submitted",
+                    message=(
+                        f"{request.user.get_full_name()} submitted a new leave request "
+                        f"({leave.leave_type}) from {leave.start_date} to {leave.end_date}."
+                    ),
+                    request=request  # optional on-site notification
+                )
             except Exception as e:
                 # Log error and notify staff
                 messages.warning(
@@ -57,25 +56,75 @@ def apply_leave(request):
     return render(request, "staff/apply_leave.html", {"form": form})
 
 
-import csv
-from django.http import HttpResponse
-from django.contrib import messages
-from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, redirect
-from .models import Leave
-import openpyxl
-from openpyxl.utils import get_column_letter
-from io import BytesIO
+from functools import partial
 
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.dateformat import format as date_format
+from django.utils.timezone import localtime
+from core.concurrency import gather_queries, run_queries
+from core.pagination import keyset_page
+from .aggregates import daily_status_trend, status_counts
+from .exports import filtered_leaves
+
+# Rows per page of the leave report table
+REPORT_PAGE_SIZE = 50
+# Seek order for the report table; id breaks ties between equal timestamps
+REPORT_ORDERING = ["staff_id", "-applied_at", "-id"]
+
+
+def report_page(params):
+    """One page of report rows (staff joined in) and the cursor for the next page."""
+    leaves = filtered_leaves(params).select_related("staff").only(
+        "leave_type", "start_date", "end_date", "status", "reason", "applied_at",
+        "staff__first_name", "staff__last_name", "staff__email",
+    )
+    return keyset_page(leaves, REPORT_ORDERING, params.get("after"), REPORT_PAGE_SIZE)
+
+
+def _leave_report_queries(request):
+    """The report's independent queries, and the context built from their results."""
+    # Filters
+    leaves = filtered_leaves(request.GET)
+
+    # Badge counts, the chart and the table's first page (further pages come
+    # from leave_report_rows) are one query each
+    queries = [
+        partial(status_counts, leaves),
+        # Daily pending/approved/rejected counts, already pivoted by the database
+        partial(daily_status_trend, leaves),
+        partial(report_page, request.GET),
+    ]
+
+    def context(counts, trend, first_page):
+        page, next_cursor = first_page
+        if not counts["total"]:
+            messages.warning(request, "No leave records found to display.")
+
+        chart_labels = [day.strftime("%Y-%m-%d") for day in trend]
+        pending_trend = [day_counts["pending"] for day_counts in trend.values()]
+        approved_trend = [day_counts["approved"] for day_counts in trend.values()]
+        rejected_trend = [day_counts["rejected"] for day_counts in trend.values()]
+
+        next_params = request.GET.copy()
+        next_params["after"] = next_cursor or ""
+
+        return {
+            "leave_requests": page,
+            "next_cursor": next_cursor,
+            "next_query": next_params.urlencode(),
+            "pending_count": counts["pending"],
+            "approved_count": counts["approved"],
+            "rejected_count": counts["rejected"],
+            # Convert to JSON for safe JS consumption
+            "chart_labels": json.dumps(chart_labels),
+            "pending_trend": json.dumps(pending_trend),
+            "approved_trend": json.dumps(approved_trend),
+            "rejected_trend": json.dumps(rejected_trend),
+        }
+
+    return queries, context
 
-from django.db.models import Count
-from django.db.models.functions import TruncDate
-from django.contrib import messages
-from django.shortcuts import render, redirect
-from leave.models import Leave
-import json
 
 @login_required
 def leave_report(request):
@@ -83,68 +132,46 @@ def leave_report(request):
         messages.error(request, "Access denied. Admin privileges required.")
         return redirect("login")
 
-    leaves = Leave.objects.all().order_by("staff", "-applied_at")
+    queries, context = _leave_report_queries(request)
+    return render(request, "leave/admin_requests.html", context(*run_queries(*queries)))
 
-    # Filters
-    staff_email = request.GET.get("staff")
-    status = request.GET.get("status")
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if staff_email:
-        leaves = leaves.filter(staff__email__icontains=staff_email)
-    if status:
-        leaves = leaves.filter(status__iexact=status.lower())
-    if start_date:
-        leaves = leaves.filter(start_date__gte=start_date)
-    if end_date:
-        leaves = leaves.filter(end_date__lte=end_date)
-
-    if not leaves.exists():
-        messages.warning(request, "No leave records found to display.")
-
-    # Aggregate daily leave counts
-    trend_data = leaves.annotate(date_only=TruncDate('applied_at')) \
-                       .values('date_only', 'status') \
-                       .annotate(count=Count('id')) \
-                       .order_by('date_only')
-
-    # Chart labels
-    chart_labels = sorted({td['date_only'].strftime("%Y-%m-%d") for td in trend_data})
-
-    # Initialize trends with 0 counts
-    pending_trend = [0] * len(chart_labels)
-    approved_trend = [0] * len(chart_labels)
-    rejected_trend = [0] * len(chart_labels)
-
-    # Fill in counts
-    for td in trend_data:
-        date_str = td['date_only'].strftime("%Y-%m-%d")
-        index = chart_labels.index(date_str)
-        if td['status'].lower() == 'pending':
-            pending_trend[index] = td['count']
-        elif td['status'].lower() == 'approved':
-            approved_trend[index] = td['count']
-        elif td['status'].lower() == 'rejected':
-            rejected_trend[index] = td['count']
-
-    # Total counts for badges
-    pending_count = leaves.filter(status="pending").count()
-    approved_count = leaves.filter(status="approved").count()
-    rejected_count = leaves.filter(status="rejected").count()
-
-    return render(request, "leave/admin_requests.html", {
-        "leave_requests": leaves,
-        "pending_count": pending_count,
-        "approved_count": approved_count,
-        "rejected_count": rejected_count,
-        # Convert to JSON for safe JS consumption
-        "chart_labels": json.dumps(chart_labels),
-        "pending_trend": json.dumps(pending_trend),
-        "approved_trend": json.dumps(approved_trend),
-        "rejected_trend": json.dumps(rejected_trend),
-    })
 
+@login_required
+async def leave_report_async(request):
+    """leave_report for ASGI, running its queries concurrently."""
+    user = await request.auser()
+    if not user.is_admin_user():
+        messages.error(request, "Access denied. Admin privileges required.")
+        return redirect("login")
+
+    queries, context = _leave_report_queries(request)
+    context = context(*await gather_queries(*queries))
+    return await sync_to_async(render)(request, "leave/admin_requests.html", context)
+
+
+@login_required
+def leave_report_rows(request):
+    """JSON page of report rows for the table's incremental scrolling."""
+    if not request.user.is_admin_user():
+        return JsonResponse({"error": "Admin privileges required."}, status=403)
+
+    page, next_cursor = report_page(request.GET)
+    return JsonResponse({
+        "rows": [
+            {
+                "staff": leave.staff.get_full_name(),
+                "email": leave.staff.email,
+                "leave_type": leave.leave_type,
+                "start_date": str(leave.start_date),
+                "end_date": str(leave.end_date),
+                "status": leave.status,
+                "reason": leave.reason,
+                "applied_at": date_format(localtime(leave.applied_at), "M d, Y H:i"),
+            }
+            for leave in page
+        ],
+        "next": next_cursor,
+    })
 
 
 @login_required
@@ -154,89 +181,37 @@ def leave_export(request, export_format):
         messages.error(request, "Access denied. Admin privileges required.")
         return redirect("login")
 
-    leaves = Leave.objects.all().order_by("staff", "-applied_at")
-
-    # Apply the same filters as in leave_report
-    staff_email = request.GET.get("staff")
-    status = request.GET.get("status")
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
+    if export_format not in ("csv", "xlsx"):
+        messages.error(request, "Invalid export format.")
+        return redirect("leave_report")
 
-    if staff_email:
-        leaves = leaves.filter(staff__email__icontains=staff_email)
-    if status:
-        leaves = leaves.filter(status__iexact=status.lower())
-    if start_date:
-        leaves = leaves.filter(start_date__gte=start_date)
-    if end_date:
-        leaves = leaves.filter(end_date__lte=end_date)
+    # Export machinery is only loaded by the export endpoints
+    from core.exports import streaming_csv_response, xlsx_response
+    from core.jobs import request_export, should_run_in_background
+    from . import exports as leave_exports
+    from .exports import HEADERS as EXPORT_HEADERS, export_rows
+
+    # Large exports run in the background
+    if should_run_in_background(request, leave_exports):
+        job, reused = request_export(request.user, "leave", export_format, request.GET)
+        if reused:
+            messages.info(request, "An identical export is already available below.")
+        else:
+            messages.success(request, "Your export is being prepared. It will be ready to download here shortly.")
+        return redirect("export_jobs")
 
     if export_format == "csv":
-        import csv
-        from django.http import HttpResponse
-
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="leave_report.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(["Staff", "Email", "Leave Type", "Start Date", "End Date", "Status", "Reason"])
-        for leave in leaves:
-            writer.writerow([
-                leave.staff.get_full_name,
-                leave.staff.email,
-                leave.leave_type,
-                leave.start_date,
-                leave.end_date,
-                leave.status.capitalize(),
-                leave.reason
-            ])
-        return response
-
-    elif export_format == "xlsx":
-        import openpyxl
-        from openpyxl.utils import get_column_letter
-        from django.http import HttpResponse
-        from io import BytesIO
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Leave Report"
-
-        headers = ["Staff", "Email", "Leave Type", "Start Date", "End Date", "Status", "Reason"]
-        ws.append(headers)
-
-        for leave in leaves:
-            ws.append([
-                leave.staff.get_full_name,
-                leave.staff.email,
-                leave.leave_type,
-                leave.start_date,
-                leave.end_date,
-                leave.status.capitalize(),
-                leave.reason
-            ])
-
-        for i, col in enumerate(ws.columns, 1):
-            max_length = max(len(str(cell.value)) for cell in col)
-            ws.column_dimensions[get_column_letter(i)].width = max_length + 2
-
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(
-            output,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="leave_report.xlsx"'
-        return response
+        return streaming_csv_response("leave_report.csv", EXPORT_HEADERS, export_rows(request.GET), request=request)
 
     else:
-        messages.error(request, "Invalid export format.")
-        return redirect("leave_report")
+        return xlsx_response(
+            "leave_report.xlsx", EXPORT_HEADERS, export_rows(request.GET),
+            sheet_title="Leave Report", request=request,
+        )
 
 
 from .models import Notification
+from .utils import get_notification_summary, invalidate_notification_cache
 from django.core.paginator import Paginator
 
 @login_required
@@ -247,7 +222,7 @@ def notifications_list(request):
     page_obj = paginator.get_page(page_number)
 
     # Check if "Mark all as read" should display
-    show_mark_all = notifications.filter(is_read=False).count() > 6
+    show_mark_all = get_notification_summary(request.user)["unread_count"] > 6
 
     context = {
         "page_obj": page_obj,
@@ -268,4 +243,6 @@ def mark_notification_read(request, notification_id):
 @login_required
 def mark_all_notifications_read(request):
     Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    # update() sends no post_save signals, so drop the cached bell explicitly
+    invalidate_notification_cache(request.user.pk)
     return redirect('notifications_list')
\ No newline at end of file
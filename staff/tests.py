@@ -1,3 +1,27 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryBudgetTestCase
+
+
+class StaffQueryBudgetTests(QueryBudgetTestCase):
+    def pages(self):
+        return [reverse("staff_dashboard"), reverse("attendance_history"), reverse("my_leave_requests")]
+
+    def test_staff(self):
+        dashboard, history, my_leaves = self.pages()
+        self.assertBudgets(self.member, {
+            dashboard: 8,
+            history: 7,
+            my_leaves: 6,
+        })
+
+    def test_admin_is_turned_away(self):
+        self.assertBudgets(self.admin, {url: 2 for url in self.pages()})
+
+    def test_anonymous_is_turned_away(self):
+        self.assertBudgets(None, {url: 0 for url in self.pages()})
+
+    def test_queries_do_not_grow_with_data(self):
+        for url in self.pages():
+            with self.subTest(url=url):
+                self.assertQueriesDoNotGrow(self.member, url)
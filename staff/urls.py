@@ -1,11 +1,12 @@
 # staff/urls.py
 from django.urls import path
+from core.concurrency import pick_view
 from . import views
 
 # app_name = "staff"
 
 urlpatterns = [
-    path("dashboard/", views.staff_dashboard, name="staff_dashboard"),
+    path("dashboard/", pick_view(views.staff_dashboard, views.staff_dashboard_async), name="staff_dashboard"),
     path("attendance-history/", views.attendance_history, name="attendance_history"),
     path("my-leave-requests/", views.my_leave_requests, name="my_leave_requests"),
 ]
@@ -1,11 +1,16 @@
 from datetime import date
+from functools import partial
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
 from attendance.models import Attendance
+from attendance.aggregates import attendance_summary, daily_trend, status_counts
+from core.concurrency import gather_queries, run_queries
 from leave.models import Leave
+from leave.aggregates import status_counts as leave_status_counts
 
 from datetime import date
 from django.utils.timezone import now
@@ -13,6 +18,47 @@ from django.utils.timezone import now
 from datetime import timedelta
 from django.utils import timezone
 
+def _staff_dashboard_queries(user):
+    """The dashboard's independent queries (one each), and the context built from their results."""
+    today = timezone.localdate()
+    records = Attendance.objects.filter(staff=user)
+
+    queries = [
+        # Attendance summary + monthly stats
+        partial(attendance_summary, records, today),
+        # Leave summary
+        partial(leave_status_counts, Leave.objects.filter(staff=user)),
+        # Check if today is already marked
+        records.filter(date=today).first,
+        # Attendance trend for last 7 days
+        partial(daily_trend, records, today - timedelta(days=6), today),
+    ]
+
+    def context(summary, leave_counts, today_record, trend):
+        return {
+            "total_attendance": summary["total"],
+            "present_count": summary["present"],
+            "absent_count": summary["absent"],
+            "late_count": summary["late"],
+            "days_present": summary["month_present"],
+            "total_days": summary["month_total"],
+            "attendance_percentage": summary["month_percentage"],
+            "total_leaves": leave_counts["total"],
+            "approved_leaves": leave_counts["approved"],
+            "pending_leaves": leave_counts["pending"],
+            "rejected_leaves": leave_counts["rejected"],
+            "today_record": today_record,
+            # Recent activity (last 5 records)
+            "recent_attendance": records.order_by("-date")[:5],
+            "trend_labels": [day.strftime("%a") for day in trend],  # Mon, Tue, ...
+            "trend_present": [counts["present"] for counts in trend.values()],
+            "trend_late": [counts["late"] for counts in trend.values()],
+            "trend_absent": [counts["absent"] for counts in trend.values()],
+        }
+
+    return queries, context
+
+
 @login_required
 def staff_dashboard(request):
     """Staff dashboard showing attendance & leave summaries."""
@@ -20,69 +66,21 @@ def staff_dashboard(request):
         messages.error(request, "Access denied. Staff account required.")
         return redirect("login")
 
-    today = timezone.now().date()
-    records = Attendance.objects.filter(staff=request.user)
-
-    # Attendance summary
-    total_attendance = records.count()
-    present_count = records.filter(status="present").count()
-    absent_count = records.filter(status="absent").count()
-    late_count = records.filter(status="late").count()
-
-    # Monthly stats
-    this_month = today.month
-    this_year = today.year
-    month_records = records.filter(date__month=this_month, date__year=this_year)
-    days_present = month_records.filter(status="present").count()
-    total_days = month_records.count()
-    attendance_percentage = round((days_present / total_days) * 100, 1) if total_days > 0 else 0
-
-    # Leave summary
-    total_leaves = Leave.objects.filter(staff=request.user).count()
-    approved_leaves = Leave.objects.filter(staff=request.user, status="approved").count()
-    pending_leaves = Leave.objects.filter(staff=request.user, status="pending").count()
-    rejected_leaves = Leave.objects.filter(staff=request.user, status="rejected").count()
-
-    # Check if today is already marked
-    today_record = records.filter(date=today).first()
-
-    # Build attendance trend for last 7 days
-    trend_labels = []
-    trend_present = []
-    trend_late = []
-    trend_absent = []
-
-    for i in range(6, -1, -1):  # last 7 days
-        day = today - timedelta(days=i)
-        trend_labels.append(day.strftime("%a"))  # Mon, Tue, ...
-        day_records = records.filter(date=day)
-        trend_present.append(day_records.filter(status="present").count())
-        trend_late.append(day_records.filter(status="late").count())
-        trend_absent.append(day_records.filter(status="absent").count())
-
-    # Recent activity (last 5 records)
-    recent_attendance = records.order_by("-date")[:5]
+    queries, context = _staff_dashboard_queries(request.user)
+    return render(request, "dashboard/staff_dashboard.html", context(*run_queries(*queries)))
 
-    context = {
-        "total_attendance": total_attendance,
-        "present_count": present_count,
-        "absent_count": absent_count,
-        "late_count": late_count,
-        "days_present": days_present,
-        "total_days": total_days,
-        "attendance_percentage": attendance_percentage,
-        "total_leaves": total_leaves,
-        "approved_leaves": approved_leaves,
-        "pending_leaves": pending_leaves,
-        "rejected_leaves": rejected_leaves,
-        "today_record": today_record,
-        "recent_attendance": recent_attendance,
-        "trend_labels": trend_labels,
-        "trend_present": trend_present,
-        "trend_late": trend_late,
-        "trend_absent": trend_absent,
-    }
-    return render(request, "dashboard/staff_dashboard.html", context)
+
+@login_required
+async def staff_dashboard_async(request):
+    """staff_dashboard for ASGI, running its queries concurrently."""
+    user = await request.auser()
+    if not user.is_staff_user():
+        messages.error(request, "Access denied. Staff account required.")
+        return redirect("login")
+
+    queries, context = _staff_dashboard_queries(user)
+    context = context(*await gather_queries(*queries))
+    return await sync_to_async(render)(request, "dashboard/staff_dashboard.html", context)
 
 
 
@@ -100,35 +98,25 @@ def attendance_history(request):
     # Get all records for this staff
     records = Attendance.objects.filter(staff=request.user).order_by("-date")
 
-    # Summary counts
-    present_count = records.filter(status="present").count()
-    late_count = records.filter(status="late").count()
-    absent_count = records.filter(status="absent").count()
-
-    # Build trend data for last 30 days
-    today = timezone.now().date()
-    trend_labels = []
-    trend_present = []
-    trend_late = []
-    trend_absent = []
-
-    for i in range(29, -1, -1):  # last 30 days
-        day = today - timedelta(days=i)
-        trend_labels.append(day.strftime("%b %d"))  # e.g., "Sep 29"
+    # Summary counts (one query)
+    counts = status_counts(records)
 
-        day_records = records.filter(date=day)
-        trend_present.append(day_records.filter(status="present").count())
-        trend_late.append(day_records.filter(status="late").count())
-        trend_absent.append(day_records.filter(status="absent").count())
+    # Build trend data for last 30 days (one query)
+    today = timezone.localdate()
+    trend = daily_trend(records, today - timedelta(days=29), today)
+    trend_labels = [day.strftime("%b %d") for day in trend]  # e.g., "Sep 29"
+    trend_present = [day_counts["present"] for day_counts in trend.values()]
+    trend_late = [day_counts["late"] for day_counts in trend.values()]
+    trend_absent = [day_counts["absent"] for day_counts in trend.values()]
 
-    if not records.exists():
+    if not counts["total"]:
         messages.info(request, "No attendance records found yet.")
 
     context = {
         "records": records,
-        "present_count": present_count,
-        "late_count": late_count,
-        "absent_count": absent_count,
+        "present_count": counts["present"],
+        "late_count": counts["late"],
+        "absent_count": counts["absent"],
         "trend_labels": trend_labels,
         "trend_present": trend_present,
         "trend_late": trend_late,
@@ -148,21 +136,18 @@ def my_leave_requests(request):
 
     leaves = Leave.objects.filter(staff=request.user).order_by("-applied_at")
 
-    # Pre-calculate counts
-    total_requests = leaves.count()
-    approved_count = leaves.filter(status="approved").count()
-    pending_count = leaves.filter(status="pending").count()
-    rejected_count = leaves.filter(status="rejected").count()
+    # Pre-calculate counts (one query)
+    counts = leave_status_counts(leaves)
 
-    if not leaves.exists():
+    if not counts["total"]:
         messages.info(request, "You have not submitted any leave requests yet.")
 
     context = {
         "leaves": leaves,
-        "total_requests": total_requests,
-        "approved_count": approved_count,
-        "pending_count": pending_count,
-        "rejected_count": rejected_count,
+        "total_requests": counts["total"],
+        "approved_count": counts["approved"],
+        "pending_count": counts["pending"],
+        "rejected_count": counts["rejected"],
     }
     return render(request, "leave/my_leave_requests.html", context)
 
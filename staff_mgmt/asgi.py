@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'staff_mgmt.settings')
+# Serve the async dashboards and reports (settings.ASYNC_VIEWS)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -31,19 +31,47 @@ DEFAULT_FROM_EMAIL = config(
     "DEFAULT_FROM_EMAIL",
     default=f"StaffHub <{EMAIL_HOST_USER}>"
 )
+# Emails are queued in the outbox (core.OutboundEmail) and sent by `manage.py send_queued_emails`.
+# For development without the worker, turn on autoflush to drain the outbox on a background
+# thread after each commit; leave it off in production, where it competes with the worker
+# and with request writes for the database.
+EMAIL_OUTBOX_AUTOFLUSH = config("EMAIL_OUTBOX_AUTOFLUSH", cast=bool, default=False)
 
 # ==========================
 # 🍪 Session Settings
 # ==========================
+# Sessions are read from the cache and only written to the database when they change
+# ("django.contrib.sessions.backends.signed_cookies" avoids the database entirely)
 SESSION_ENGINE = config(
     "SESSION_ENGINE",
-    default="django.contrib.sessions.backends.db"
+    default="django.contrib.sessions.backends.cached_db"
 )
 SESSION_COOKIE_NAME = "sessionid"
 SESSION_COOKIE_AGE = config("SESSION_COOKIE_AGE", cast=int, default=3600)  # 1hr in seconds
-SESSION_SAVE_EVERY_REQUEST = config("SESSION_SAVE_EVERY_REQUEST", cast=bool, default=True)
+# Off: core.middleware.SlidingSessionMiddleware extends idle sessions instead of saving on every request
+SESSION_SAVE_EVERY_REQUEST = config("SESSION_SAVE_EVERY_REQUEST", cast=bool, default=False)
+# An unchanged session is re-saved (and its expiry pushed back) once less than this many seconds remain
+SESSION_REFRESH_THRESHOLD = config("SESSION_REFRESH_THRESHOLD", cast=int, default=2700)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = config("SESSION_EXPIRE_AT_BROWSER_CLOSE", cast=bool, default=True)
 
+# ==========================
+# 🗄 Cache
+# ==========================
+# Local-memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached to share across workers
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default="staffhub"),
+    }
+}
+NOTIFICATIONS_CACHE_ALIAS = config("NOTIFICATIONS_CACHE_ALIAS", default="default")
+NOTIFICATIONS_CACHE_TIMEOUT = config("NOTIFICATIONS_CACHE_TIMEOUT", cast=int, default=300)  # seconds
+AUTH_USER_CACHE_ALIAS = config("AUTH_USER_CACHE_ALIAS", default="default")
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", cast=int, default=300)  # seconds
+ATTENDANCE_POLICY_CACHE_TTL = config("ATTENDANCE_POLICY_CACHE_TTL", cast=int, default=300)  # seconds per process
+# How often a process checks the shared cache for policy changes made by other processes
+ATTENDANCE_POLICY_VERSION_TTL = config("ATTENDANCE_POLICY_VERSION_TTL", cast=int, default=5)  # seconds
+
 # ==========================
 # ⏳ Token Expiry Times
 # ==========================
@@ -54,6 +82,30 @@ PASSWORD_RESET_TOKEN_EXPIRY_HOURS = config("PASSWORD_RESET_TOKEN_EXPIRY_HOURS",
 OTP_EXPIRY_DELTA = timedelta(minutes=OTP_EXPIRY_MINUTES)
 PASSWORD_RESET_TOKEN_EXPIRY_DELTA = timedelta(hours=PASSWORD_RESET_TOKEN_EXPIRY_HOURS)
 
+# ==========================
+# 📨 Staff Invitations
+# ==========================
+# Most addresses one bulk invitation (upload, pasted list or `manage.py invite_staff`) may contain
+BULK_INVITE_MAX_ROWS = config("BULK_INVITE_MAX_ROWS", cast=int, default=2000)
+
+# ==========================
+# 📤 Report Exports
+# ==========================
+# Exports with more rows than this are generated by the run_export_jobs worker (0 = never)
+EXPORT_BACKGROUND_THRESHOLD = config("EXPORT_BACKGROUND_THRESHOLD", cast=int, default=50000)
+# Finished exports with identical filters are reused for this long
+EXPORT_JOB_TTL_MINUTES = config("EXPORT_JOB_TTL_MINUTES", cast=int, default=30)
+
+# ==========================
+# ⏱️ Request Metrics
+# ==========================
+# Query count, DB/template/wall time per request, in Server-Timing headers and `manage.py slowest_endpoints`
+REQUEST_METRICS_ENABLED = config("REQUEST_METRICS_ENABLED", cast=bool, default=False)
+# Shared with the management command, so use a cache all processes can reach (e.g. Redis) when enabling in production
+REQUEST_METRICS_CACHE_ALIAS = config("REQUEST_METRICS_CACHE_ALIAS", default="default")
+REQUEST_METRICS_WINDOW = config("REQUEST_METRICS_WINDOW", cast=int, default=200)  # samples kept per endpoint
+REQUEST_METRICS_FLUSH_SECONDS = config("REQUEST_METRICS_FLUSH_SECONDS", cast=int, default=5)
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -85,11 +137,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -115,6 +169,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'staff_mgmt.wsgi.application'
+ASGI_APPLICATION = 'staff_mgmt.asgi.application'
 
 from django.contrib.messages import constants as messages
 
@@ -142,6 +197,37 @@ DATABASES = {
     }
 }
 
+# Production SQLite: WAL so report reads never wait on check-in writes (and vice versa),
+# BEGIN IMMEDIATE so a write transaction takes the lock up front and waits for it instead
+# of failing mid-way with "database is locked", and connections kept open between requests.
+SQLITE_PRODUCTION_MODE = config("SQLITE_PRODUCTION_MODE", cast=bool, default=False)
+SQLITE_BUSY_TIMEOUT = config("SQLITE_BUSY_TIMEOUT", cast=int, default=20)  # seconds a write waits for the lock
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",      # Safe with WAL; fsync at checkpoints instead of every commit
+    "PRAGMA mmap_size = 268435456",     # 256 MB of the file memory-mapped for reads
+    "PRAGMA cache_size = -32000",       # 32 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+]
+if SQLITE_PRODUCTION_MODE:
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': config("DATABASE_CONN_MAX_AGE", cast=int, default=600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': '; '.join(SQLITE_PRAGMAS),
+        },
+    })
+
+# Route the dashboards and reports to their async views (see core.concurrency.pick_view).
+# staff_mgmt/asgi.py turns this on; WSGI keeps the sync views, which are faster there
+ASYNC_VIEWS = config("ASYNC_VIEWS", cast=bool, default=False)
+# The async views run their independent queries at the same time, each on its own
+# connection. Off by default on a single core, where the queries cannot overlap and the
+# extra threads only add overhead
+ASYNC_PARALLEL_QUERIES = config("ASYNC_PARALLEL_QUERIES", cast=bool, default=(os.cpu_count() or 1) > 1)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators